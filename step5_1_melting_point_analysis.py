@@ -72,9 +72,19 @@ import matplotlib.pyplot as plt
 from pathlib import Path
 from scipy import stats
 from scipy.interpolate import interp1d
+from scipy.ndimage import gaussian_filter1d
 import warnings
 warnings.filterwarnings('ignore')
 
+# Copy-on-Write: 筛选得到的子表只读，不再需要防御性 .copy()
+pd.set_option('mode.copy_on_write', True)
+
+try:
+    import polars as pl
+    HAS_POLARS = True
+except ImportError:
+    HAS_POLARS = False
+
 # ============================================================================
 # 配置
 # ============================================================================
@@ -93,6 +103,31 @@ OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 plt.rcParams['font.family'] = 'Arial'
 plt.rcParams['font.size'] = 10
 plt.rcParams['axes.unicode_minus'] = False
+# 坐标轴标签 / 标题 / 图例的统一样式，绘图时不再逐个传 fontsize/fontweight
+plt.rcParams.update({
+    'axes.labelsize': 11,
+    'axes.labelweight': 'bold',
+    'axes.titlesize': 12,
+    'axes.titleweight': 'bold',
+    'legend.fontsize': 9,
+})
+
+# 结构类型的绘图样式
+COLORS = {
+    'air': '#1E90FF',      # 蓝色 - 气相
+    'supported': '#2E8B57', # 绿色 - 负载型
+    'oxide': '#FF6347'      # 红色 - 含氧
+}
+MARKERS = {
+    'air': 'o',
+    'supported': 's', 
+    'oxide': '^'
+}
+LABELS = {
+    'air': 'Gas-phase Alloy',
+    'supported': 'Supported Alloy',
+    'oxide': 'Supported Oxide'
+}
 
 print("=" * 70)
 print("Step 5.1: Melting Point Analysis")
@@ -121,6 +156,9 @@ def parse_args():
 # 解析命令行参数
 args = parse_args()
 
+# 屏蔽列表 (小写 frozenset，只构造一次，供 O(1) 成员查询)
+EXCLUDE_SET = frozenset(s.lower() for s in args.exclude)
+
 
 # ============================================================================
 # 1. 组成解析函数
@@ -198,12 +236,39 @@ def classify_structure(name):
 # 2. 林德曼指数熔点分析 (方法A)
 # ============================================================================
 
-def calculate_melting_point_lindemann(df_structure, threshold=0.1):
+def compute_delta_profile(df_structure):
+    """
+    计算单个结构的 δ(T) 曲线，供阈值法与跃变点法共用
+    
+    一次性完成高斯平滑和温度步长计算，避免两种方法各自重复平滑和差分。
+    
+    Args:
+        df_structure: 单个结构按温度平均后的数据 (load_delta_averages 的子集，
+                      已按 temp 排序，含 temp / delta_mean 列)
+    
+    Returns:
+        tuple: (temps, deltas, deltas_smooth, dT)
+        - temps: 排序后的温度点
+        - deltas: 各温度的平均 δ
+        - deltas_smooth: 高斯平滑后的 δ (点数 < 3 时为 None)
+        - dT: 相邻温度步长 np.diff(temps)
+    """
+    temps = df_structure['temp'].values
+    deltas = df_structure['delta_mean'].values
+    
+    # 平滑处理（高斯滤波），避免噪声影响
+    deltas_smooth = gaussian_filter1d(deltas, sigma=1) if len(temps) >= 3 else None
+    dT = np.diff(temps)
+    
+    return temps, deltas, deltas_smooth, dT
+
+
+def calculate_melting_point_lindemann(profile, threshold=0.1):
     """
     使用林德曼指数跃变法计算熔点
     
     Args:
-        df_structure: 单个结构的数据
+        profile: compute_delta_profile() 返回的 (temps, deltas, deltas_smooth, dT)
         threshold: 林德曼阈值 (默认 0.1)
     
     Returns:
@@ -214,15 +279,7 @@ def calculate_melting_point_lindemann(df_structure, threshold=0.1):
             'delta_at_Tm': 熔点处的 δ 值
         }
     """
-    # 按温度分组计算平均 Lindemann 指数
-    df_avg = df_structure.groupby('temp').agg({
-        'delta': ['mean', 'std', 'count']
-    }).reset_index()
-    df_avg.columns = ['temp', 'delta_mean', 'delta_std', 'count']
-    df_avg = df_avg.sort_values('temp')
-    
-    temps = df_avg['temp'].values
-    deltas = df_avg['delta_mean'].values
+    temps, deltas, _, dT = profile
     
     if len(temps) < 2:
         return None
@@ -241,7 +298,7 @@ def calculate_melting_point_lindemann(df_structure, threshold=0.1):
                 Tm = (T1 + T2) / 2
             
             # 误差估计 (取温度步长的一半)
-            Tm_err = (T2 - T1) / 2
+            Tm_err = dT[i] / 2
             
             return {
                 'Tm_lindemann': Tm,
@@ -268,7 +325,7 @@ def calculate_melting_point_lindemann(df_structure, threshold=0.1):
             'Tm_lindemann': temps[0],  # 最低温度
             'Tm_lindemann_err': np.nan,
             'method': 'lindemann',
-            'note': f'Melted at lowest T ({temps[0]} K)'
+            'note': f'Melted at lowest T ({temps[0]:g} K)'
         }
     
     return None
@@ -278,14 +335,14 @@ def calculate_melting_point_lindemann(df_structure, threshold=0.1):
 # 2.5 林德曼指数跃变点分析 (方法A2: dδ/dT 最大值)
 # ============================================================================
 
-def calculate_melting_point_transition(df_structure):
+def calculate_melting_point_transition(profile):
     """
     使用林德曼指数跃变点法计算熔点 (dδ/dT 最大值)
     
     物理意义：找到 δ(T) 曲线斜率最大的点，即熔化转变最剧烈的温度
     
     Args:
-        df_structure: 单个结构的数据
+        profile: compute_delta_profile() 返回的 (temps, deltas, deltas_smooth, dT)
     
     Returns:
         dict: {
@@ -295,26 +352,12 @@ def calculate_melting_point_transition(df_structure):
             'delta_at_transition': 跃变点处的 δ 值
         }
     """
-    from scipy.ndimage import gaussian_filter1d
-    
-    # 按温度分组计算平均 Lindemann 指数
-    df_avg = df_structure.groupby('temp').agg({
-        'delta': ['mean', 'std']
-    }).reset_index()
-    df_avg.columns = ['temp', 'delta_mean', 'delta_std']
-    df_avg = df_avg.sort_values('temp')
-    
-    temps = df_avg['temp'].values
-    deltas = df_avg['delta_mean'].values
+    temps, _, deltas_smooth, dT = profile
     
     if len(temps) < 3:
         return None
     
-    # 平滑处理（高斯滤波），避免噪声影响
-    deltas_smooth = gaussian_filter1d(deltas, sigma=1)
-    
     # 计算 dδ/dT (中心差分)
-    dT = np.diff(temps)
     dDelta = np.diff(deltas_smooth)
     dDelta_dT = dDelta / dT
     
@@ -392,24 +435,27 @@ def calculate_melting_point_clustering(structure_name):
     if 'phase_clustered' not in df.columns:
         return None
     
-    # 分区1 和 分区2 的温度范围
-    df_p1 = df[df['phase_clustered'] == 'partition1']
-    df_p2 = df[df['phase_clustered'] == 'partition2']
+    # 分区1 和 分区2 的温度范围 (直接在 ndarray 上构造一次掩码)
+    phase = df['phase_clustered'].to_numpy()
+    temp = df['temp'].to_numpy()
+    delta = df['delta'].to_numpy()
+    m1 = phase == 'partition1'
+    m2 = phase == 'partition2'
     
-    if df_p1.empty or df_p2.empty:
+    if not m1.any() or not m2.any():
         return None
     
     # 分区边界 = partition1 最高温度 和 partition2 最低温度 的中点
-    p1_Tmax = df_p1['temp'].max()
-    p2_Tmin = df_p2['temp'].min()
+    p1_Tmax = np.nanmax(temp[m1])
+    p2_Tmin = np.nanmin(temp[m2])
     
     # 相变温度 = 边界中点
     Tm = (p1_Tmax + p2_Tmin) / 2
     Tm_err = abs(p2_Tmin - p1_Tmax) / 2
     
-    # 同时获取分区的 δ 均值
-    delta_p1 = df_p1['delta'].mean()
-    delta_p2 = df_p2['delta'].mean()
+    # 同时获取分区的 δ 均值 (与 pandas 一致，忽略 NaN)
+    delta_p1 = np.nanmean(delta[m1])
+    delta_p2 = np.nanmean(delta[m2])
     
     return {
         'Tm_clustering': Tm,
@@ -426,6 +472,47 @@ def calculate_melting_point_clustering(structure_name):
 # 4. 主分析函数
 # ============================================================================
 
+def load_delta_averages():
+    """
+    读取主数据并按 (structure, temp) 分组计算平均 δ
+    
+    安装了 Polars 时用其多线程读取 CSV 并分组；否则回退到 pandas。
+    只计算后续用到的均值。temp / delta 以 float32 读入 (MD 数据精度远低于
+    1e-6)，平滑与差分全程保持 float32，只在写入结果表时转为 float64。
+    
+    Returns:
+        tuple: (df_avg, n_records)
+        - df_avg: 列 structure / temp / delta_mean，按 (structure, temp) 排序
+        - n_records: 原始记录数
+    """
+    if HAS_POLARS:
+        df = pl.read_csv(
+            DATA_FILE, columns=['structure', 'temp', 'delta'],
+            schema_overrides={'temp': pl.Float32, 'delta': pl.Float32}
+        )
+        agg = (
+            df.group_by(['structure', 'temp'])
+            .agg(pl.col('delta').mean().alias('delta_mean'))
+            .sort(['structure', 'temp'])
+        )
+        # 逐列转换 (不依赖 pyarrow)
+        df_avg = pd.DataFrame({col: agg[col].to_numpy() for col in agg.columns})
+        n_records = df.height
+    else:
+        df = pd.read_csv(
+            DATA_FILE, usecols=['structure', 'temp', 'delta'],
+            dtype={'temp': np.float32, 'delta': np.float32}
+        )
+        df_avg = (
+            df.groupby(['structure', 'temp'], sort=True)['delta']
+            .mean()
+            .reset_index(name='delta_mean')
+        )
+        n_records = len(df)
+    
+    return df_avg, n_records
+
+
 def analyze_all_melting_points():
     """
     分析所有结构的熔点
@@ -436,17 +523,27 @@ def analyze_all_melting_points():
         print(f"  [ERROR] Data file not found: {DATA_FILE}")
         return None
     
-    df = pd.read_csv(DATA_FILE)
-    print(f"  Loaded {len(df)} records from {len(df['structure'].unique())} structures")
-    
-    results = []
-    
-    structures = sorted(df['structure'].unique())
+    df_avg, n_records = load_delta_averages()
+    structures = sorted(df_avg['structure'].unique())
+    print(f"  Loaded {n_records} records from {len(structures)} structures")
+    
+    # 按列预分配结果数组 (SoA)，避免每个结构构造一个 row dict
+    n_max = len(structures)
+    names, type_keys, type_labels = [], [], []
+    lindemann_notes, transition_notes = [], []
+    arr_pt = np.zeros(n_max, dtype=int)
+    arr_sn = np.zeros(n_max, dtype=int)
+    arr_o = np.zeros(n_max, dtype=int)
+    lindemann_cols = ['Tm_lindemann', 'Tm_lindemann_err']
+    transition_cols = ['Tm_transition', 'Tm_transition_err', 'dDelta_dT_max', 'delta_at_transition']
+    clustering_cols = ['Tm_clustering', 'Tm_clustering_err', 'delta_partition1', 'delta_partition2']
+    values = {col: np.full(n_max, np.nan)
+              for col in lindemann_cols + transition_cols + clustering_cols}
     
     print(f"\n[2] Analyzing melting points...")
     
-    for structure in structures:
-        df_struct = df[df['structure'] == structure]
+    i = 0
+    for structure, df_struct in df_avg.groupby('structure', sort=True):
         
         # 解析组成
         comp = parse_composition(structure)
@@ -454,89 +551,88 @@ def analyze_all_melting_points():
             continue
         
         pt, sn, o = comp
-        total_atoms = pt + sn + o
-        pt_sn_ratio = pt / sn if sn > 0 else float('inf')
-        # Sn fraction = Sn / (Pt + Sn + O)，考虑整个团簇的组成
-        sn_fraction = sn / total_atoms if total_atoms > 0 else 0
         
         # 分类
         type_key, type_label = classify_structure(structure)
         
+        # δ(T) 曲线: 分组、平滑、差分只做一次，两种方法共用
+        profile = compute_delta_profile(df_struct)
+        
         # 方法A1: 林德曼指数阈值法 (δ = 0.1)
-        result_lindemann = calculate_melting_point_lindemann(df_struct)
+        result_lindemann = calculate_melting_point_lindemann(profile)
         
         # 方法A2: 林德曼指数跃变点法 (dδ/dT 最大值)
-        result_transition = calculate_melting_point_transition(df_struct)
+        result_transition = calculate_melting_point_transition(profile)
         
         # 方法B: 聚类分区
         result_clustering = calculate_melting_point_clustering(structure)
         
         # 汇总
-        row = {
-            'structure': structure,
-            'type': type_key,
-            'type_label': type_label,
-            'Pt': pt,
-            'Sn': sn,
-            'O': o,
-            'total_atoms': total_atoms,
-            'Pt_Sn_ratio': pt_sn_ratio,
-            'Sn_fraction': sn_fraction,
-            'has_oxygen': o > 0,
-        }
+        names.append(structure)
+        type_keys.append(type_key)
+        type_labels.append(type_label)
+        arr_pt[i], arr_sn[i], arr_o[i] = pt, sn, o
         
         # 林德曼法结果
         if result_lindemann:
-            row['Tm_lindemann'] = result_lindemann.get('Tm_lindemann', np.nan)
-            row['Tm_lindemann_err'] = result_lindemann.get('Tm_lindemann_err', np.nan)
-            row['lindemann_note'] = result_lindemann.get('note', '')
+            for col in lindemann_cols:
+                values[col][i] = result_lindemann.get(col, np.nan)
+            lindemann_notes.append(result_lindemann.get('note', ''))
         else:
-            row['Tm_lindemann'] = np.nan
-            row['Tm_lindemann_err'] = np.nan
-            row['lindemann_note'] = 'No transition found'
+            lindemann_notes.append('No transition found')
         
         # 跃变点法结果 (dδ/dT 最大值)
         if result_transition:
-            row['Tm_transition'] = result_transition.get('Tm_transition', np.nan)
-            row['Tm_transition_err'] = result_transition.get('Tm_transition_err', np.nan)
-            row['dDelta_dT_max'] = result_transition.get('dDelta_dT_max', np.nan)
-            row['delta_at_transition'] = result_transition.get('delta_at_transition', np.nan)
-            row['transition_note'] = result_transition.get('note', '')
+            for col in transition_cols:
+                values[col][i] = result_transition.get(col, np.nan)
+            transition_notes.append(result_transition.get('note', ''))
         else:
-            row['Tm_transition'] = np.nan
-            row['Tm_transition_err'] = np.nan
-            row['dDelta_dT_max'] = np.nan
-            row['delta_at_transition'] = np.nan
-            row['transition_note'] = 'No transition found'
+            transition_notes.append('No transition found')
         
         # 聚类法结果
         if result_clustering:
-            row['Tm_clustering'] = result_clustering.get('Tm_clustering', np.nan)
-            row['Tm_clustering_err'] = result_clustering.get('Tm_clustering_err', np.nan)
-            row['delta_partition1'] = result_clustering.get('delta_partition1', np.nan)
-            row['delta_partition2'] = result_clustering.get('delta_partition2', np.nan)
-        else:
-            row['Tm_clustering'] = np.nan
-            row['Tm_clustering_err'] = np.nan
-            row['delta_partition1'] = np.nan
-            row['delta_partition2'] = np.nan
-        
-        # 方法间差异计算
-        # Tm_lindemann vs Tm_clustering
-        if not np.isnan(row['Tm_lindemann']) and not np.isnan(row['Tm_clustering']):
-            row['Tm_diff_lind_clust'] = row['Tm_lindemann'] - row['Tm_clustering']
-        else:
-            row['Tm_diff_lind_clust'] = np.nan
+            for col in clustering_cols:
+                values[col][i] = result_clustering.get(col, np.nan)
         
-        # Tm_lindemann vs Tm_transition (阈值法 vs 跃变点法)
-        if not np.isnan(row['Tm_lindemann']) and not np.isnan(row['Tm_transition']):
-            row['Tm_diff_lind_trans'] = row['Tm_lindemann'] - row['Tm_transition']
-        else:
-            row['Tm_diff_lind_trans'] = np.nan
-        
-        results.append(row)
+        i += 1
+    
+    # 截掉未解析组成的结构留下的空位
+    arr_pt, arr_sn, arr_o = arr_pt[:i], arr_sn[:i], arr_o[:i]
+    values = {col: arr[:i] for col, arr in values.items()}
     
-    df_results = pd.DataFrame(results)
+    total_atoms = arr_pt + arr_sn + arr_o
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pt_sn_ratio = np.where(arr_sn > 0, arr_pt / arr_sn, np.inf)
+        # Sn fraction = Sn / (Pt + Sn + O)，考虑整个团簇的组成
+        sn_fraction = np.where(total_atoms > 0, arr_sn / total_atoms, 0.0)
+    
+    df_results = pd.DataFrame({
+        'structure': names,
+        'type': type_keys,
+        'type_label': type_labels,
+        'Pt': arr_pt,
+        'Sn': arr_sn,
+        'O': arr_o,
+        'total_atoms': total_atoms,
+        'Pt_Sn_ratio': pt_sn_ratio,
+        'Sn_fraction': sn_fraction,
+        'has_oxygen': arr_o > 0,
+        'Tm_lindemann': values['Tm_lindemann'],
+        'Tm_lindemann_err': values['Tm_lindemann_err'],
+        'lindemann_note': lindemann_notes,
+        'Tm_transition': values['Tm_transition'],
+        'Tm_transition_err': values['Tm_transition_err'],
+        'dDelta_dT_max': values['dDelta_dT_max'],
+        'delta_at_transition': values['delta_at_transition'],
+        'transition_note': transition_notes,
+        'Tm_clustering': values['Tm_clustering'],
+        'Tm_clustering_err': values['Tm_clustering_err'],
+        'delta_partition1': values['delta_partition1'],
+        'delta_partition2': values['delta_partition2'],
+        # 方法间差异 (任一方为 NaN 时结果自然为 NaN)
+        'Tm_diff_lind_clust': values['Tm_lindemann'] - values['Tm_clustering'],
+        'Tm_diff_lind_trans': values['Tm_lindemann'] - values['Tm_transition'],
+    })
     
     # 保存结果
     output_csv = OUTPUT_DIR / 'melting_point_summary.csv'
@@ -548,6 +644,55 @@ def analyze_all_melting_points():
     return df_results
 
 
+# ============================================================================
+# 4.5 批量线性拟合
+# ============================================================================
+
+def batch_linregress(groups):
+    """
+    对多组 (x, y) 一次性做最小二乘直线拟合
+    
+    用闭式解代替逐组调用 stats.linregress：所有组拼接成一个数组，
+    按组号用 np.bincount 一次求出 n、均值和中心化的 Σdx²、Σdy²、Σdxdy，
+    再解析得到斜率、截距、r 和双侧 p 值 (与 linregress 相同的 t 检验)。
+    
+    Args:
+        groups: [(x, y), ...] 每组为等长一维数组，且至少 3 个点
+    
+    Returns:
+        list: 与输入同序的 (slope, intercept, r, p) 元组
+    """
+    if not groups:
+        return []
+    
+    n_groups = len(groups)
+    sizes = np.array([len(x) for x, _ in groups])
+    gid = np.repeat(np.arange(n_groups), sizes)
+    x = np.concatenate([np.asarray(x, dtype=float) for x, _ in groups])
+    y = np.concatenate([np.asarray(y, dtype=float) for _, y in groups])
+    
+    n = sizes.astype(float)
+    x_mean = np.bincount(gid, weights=x, minlength=n_groups) / n
+    y_mean = np.bincount(gid, weights=y, minlength=n_groups) / n
+    dx = x - x_mean[gid]
+    dy = y - y_mean[gid]
+    ss_xx = np.bincount(gid, weights=dx * dx, minlength=n_groups)
+    ss_yy = np.bincount(gid, weights=dy * dy, minlength=n_groups)
+    ss_xy = np.bincount(gid, weights=dx * dy, minlength=n_groups)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = ss_xy / ss_xx
+        intercept = y_mean - slope * x_mean
+        denom = ss_xx * ss_yy
+        r = np.where(denom > 0, ss_xy / np.sqrt(denom), 0.0)
+        r = np.clip(r, -1.0, 1.0)
+        dof = n - 2
+        t = r * np.sqrt(dof / ((1.0 - r) * (1.0 + r)))
+        p = 2 * stats.t.sf(np.abs(t), dof)
+    
+    return list(zip(slope, intercept, r, p))
+
+
 # ============================================================================
 # 5. 可视化
 # ============================================================================
@@ -555,111 +700,132 @@ def analyze_all_melting_points():
 def plot_melting_point_analysis(df_results):
     """
     生成熔点分析可视化
+    
+    Returns:
+        dict: 绘图过程中筛选出的子表，供 generate_report 复用
+              {'valid', 'both', 'no_o', 'with_o'}；无有效数据时返回 None
     """
     print(f"\n[3] Generating visualizations...")
     
-    # 过滤有效数据
-    df_valid = df_results[~df_results['Tm_lindemann'].isna()].copy()
+    # 过滤有效数据，只保留绘图和报告用到的列
+    plot_cols = ['structure', 'type', 'has_oxygen', 'Pt', 'Sn', 'O',
+                 'Sn_fraction', 'total_atoms',
+                 'Tm_lindemann', 'Tm_clustering', 'Tm_diff_lind_clust']
+    df_valid = df_results.loc[~np.isnan(df_results['Tm_lindemann'].to_numpy()), plot_cols]
     
     if df_valid.empty:
         print("  [WARNING] No valid melting point data")
-        return
+        return None
+    
+    # 结构名小写只计算一次，存为辅助列供屏蔽列表匹配
+    df_valid = df_valid.assign(_structure_lc=df_valid['structure'].str.lower())
     
     # ========================================================================
     # 图1: 熔点 vs Sn 含量 (按类型分组)
     # ========================================================================
-    fig, axes = plt.subplots(3, 2, figsize=(14, 16))
-    
-    # 获取屏蔽列表
-    exclude_list = [s.lower() for s in args.exclude]
-    
-    # 样式设置 - 使用中英文混合标签
-    colors = {
-        'air': '#1E90FF',      # 蓝色 - 气相
-        'supported': '#2E8B57', # 绿色 - 负载型
-        'oxide': '#FF6347'      # 红色 - 含氧
-    }
-    markers = {
-        'air': 'o',
-        'supported': 's', 
-        'oxide': '^'
+    fig, axes = plt.subplots(3, 2, figsize=(14, 16), constrained_layout=True)
+    
+    # 预先构造各面板共用的筛选掩码 (逐个查哈希集合)
+    structure_lower = df_valid['_structure_lc'].to_numpy()
+    not_excluded = np.fromiter((name not in EXCLUDE_SET for name in structure_lower),
+                               dtype=bool, count=len(structure_lower))
+    type_arr = df_valid['type'].to_numpy()
+    is_supported = type_arr == 'supported'
+    no_ox = df_valid['has_oxygen'].to_numpy() == False
+    supported_mask = is_supported & no_ox & not_excluded
+    type_masks = {type_key: (type_arr == type_key) & not_excluded
+                  for type_key in ['air', 'supported', 'oxide']}
+    
+    # 散点数据 (Sn_fraction, total_atoms, Tm) 按分组只提取一次，各面板共用
+    sn_frac_arr = df_valid['Sn_fraction'].to_numpy()
+    atoms_arr = df_valid['total_atoms'].to_numpy()
+    tm_arr = df_valid['Tm_lindemann'].to_numpy()
+    scatter_masks = {
+        'supported_alloy': supported_mask,  # 负载型无氧合金 (面板 a/b)
+        'no_oxygen': no_ox,                 # 图2 (不应用屏蔽列表)
+        'with_oxygen': ~no_ox,
+        **type_masks,                       # 面板 e/f
     }
-    labels = {
-        'air': 'Gas-phase Alloy',
-        'supported': 'Supported Alloy',
-        'oxide': 'Supported Oxide'
+    scatter_data = {key: (sn_frac_arr[mask], atoms_arr[mask], tm_arr[mask])
+                    for key, mask in scatter_masks.items()}
+    
+    # Pt8SnX / Pt6SnX / Pt(8-x)SnX 系列 - 仅负载型无氧合金 (图3)
+    # 只取 (Sn, Tm) 两列并用 argsort 按 Sn 排序，不排序整张子表
+    pt_arr = df_valid['Pt'].to_numpy()
+    sn_arr = df_valid['Sn'].to_numpy()
+    series_mask = (df_valid['O'].to_numpy() == 0) & is_supported & not_excluded
+    series_data = {}
+    for key, mask in [('pt8', (pt_arr == 8) & series_mask),
+                      ('pt6', (pt_arr == 6) & series_mask),
+                      ('total8', ((pt_arr + sn_arr) == 8) & series_mask)]:
+        sn, tm = sn_arr[mask], tm_arr[mask]
+        order = np.argsort(sn, kind='stable')
+        series_data[key] = (sn[order], tm[order])
+    
+    # 所有线性拟合 (点数 > 2 的组) 一次性批量计算
+    sup_sn_frac, sup_atoms, sup_tm = scatter_data['supported_alloy']
+    fit_inputs = {
+        'sn_fraction': (sup_sn_frac, sup_tm),
+        'total_atoms': (sup_atoms, sup_tm),
+        **series_data,
     }
+    fit_inputs = {key: xy for key, xy in fit_inputs.items() if len(xy[0]) > 2}
+    fits = dict(zip(fit_inputs, batch_linregress(list(fit_inputs.values()))))
     
     # --- (a) Tm (Lindemann) vs Sn fraction - 仅负载型无氧合金 ---
     ax = axes[0, 0]
-    df_supported = df_valid[
-        (df_valid['type'] == 'supported') & 
-        (df_valid['has_oxygen'] == False) &
-        (~df_valid['structure'].str.lower().isin(exclude_list))  # 应用过滤
-    ]
-    
-    if not df_supported.empty:
-        ax.scatter(df_supported['Sn_fraction'], df_supported['Tm_lindemann'],
+    
+    if len(sup_tm) > 0:
+        ax.scatter(sup_sn_frac, sup_tm,
                   c='#2E8B57', marker='s', s=80, alpha=0.8,
-                  label='Supported Alloy')
+                  label='Supported Alloy', rasterized=True)
         
         # 线性拟合
-        if len(df_supported) > 2:
-            slope, intercept, r, p, se = stats.linregress(
-                df_supported['Sn_fraction'], df_supported['Tm_lindemann']
-            )
-            x_fit = np.linspace(df_supported['Sn_fraction'].min(), 
-                               df_supported['Sn_fraction'].max(), 100)
+        if 'sn_fraction' in fits:
+            slope, intercept, r, p = fits['sn_fraction']
+            x_fit = np.array([sup_sn_frac.min(), sup_sn_frac.max()])  # 直线只需两个端点
             y_fit = slope * x_fit + intercept
             ax.plot(x_fit, y_fit, '--', color='gray', linewidth=2,
                    label=f'Fit: {slope:.0f}x + {intercept:.0f}\n$R^2$={r**2:.2f}, p={p:.4f}')
     
-    ax.set_xlabel('Sn Fraction = Sn/(Pt+Sn+O)', fontsize=11, fontweight='bold')
-    ax.set_ylabel('Melting Point $T_m$ (K)', fontsize=11, fontweight='bold')
-    ax.set_title('(a) $T_m$ vs Sn Fraction (Supported Alloy)', fontsize=12, fontweight='bold')
-    ax.legend(fontsize=9)
+    ax.set_xlabel('Sn Fraction = Sn/(Pt+Sn+O)')
+    ax.set_ylabel('Melting Point $T_m$ (K)')
+    ax.set_title('(a) $T_m$ vs Sn Fraction (Supported Alloy)')
+    ax.legend()
     ax.grid(True, alpha=0.3)
     
     # --- (b) Tm (Lindemann) vs total atoms - 仅负载型无氧合金 ---
     ax = axes[0, 1]
-    df_supported_b = df_valid[
-        (df_valid['type'] == 'supported') & 
-        (df_valid['has_oxygen'] == False) &
-        (~df_valid['structure'].str.lower().isin(exclude_list))  # 应用过滤
-    ]
-    
-    if not df_supported_b.empty:
-        ax.scatter(df_supported_b['total_atoms'], df_supported_b['Tm_lindemann'],
+    if len(sup_tm) > 0:
+        ax.scatter(sup_atoms, sup_tm,
                   c='#2E8B57', marker='s', s=80, alpha=0.8,
-                  label='Supported Alloy')
+                  label='Supported Alloy', rasterized=True)
         
         # 线性拟合
-        if len(df_supported_b) > 2:
-            slope, intercept, r, p, se = stats.linregress(
-                df_supported_b['total_atoms'], df_supported_b['Tm_lindemann']
-            )
-            x_fit = np.linspace(df_supported_b['total_atoms'].min(), 
-                               df_supported_b['total_atoms'].max(), 100)
+        if 'total_atoms' in fits:
+            slope, intercept, r, p = fits['total_atoms']
+            x_fit = np.array([sup_atoms.min(), sup_atoms.max()])
             y_fit = slope * x_fit + intercept
             ax.plot(x_fit, y_fit, '--', color='gray', linewidth=2,
                    label=f'Fit: {slope:.1f}x + {intercept:.0f}\n$R^2$={r**2:.2f}, p={p:.4f}')
     
-    ax.set_xlabel('Total Atoms (Pt + Sn)', fontsize=11, fontweight='bold')
-    ax.set_ylabel('Melting Point $T_m$ (K)', fontsize=11, fontweight='bold')
-    ax.set_title('(b) $T_m$ vs Total Atoms (Supported Alloy)', fontsize=12, fontweight='bold')
-    ax.legend(fontsize=9)
+    ax.set_xlabel('Total Atoms (Pt + Sn)')
+    ax.set_ylabel('Melting Point $T_m$ (K)')
+    ax.set_title('(b) $T_m$ vs Total Atoms (Supported Alloy)')
+    ax.legend()
     ax.grid(True, alpha=0.3)
     
     # --- (c) Tm (Lindemann) vs Tm (Clustering) comparison ---
     ax = axes[1, 0]
-    df_both = df_valid[~df_valid['Tm_clustering'].isna()]
+    df_both = df_valid.iloc[~np.isnan(df_valid['Tm_clustering'].to_numpy())]
     
+    both_types = df_both['type'].to_numpy()
     for type_key in ['air', 'supported', 'oxide']:
-        df_type = df_both[df_both['type'] == type_key]
+        df_type = df_both.iloc[both_types == type_key]
         if not df_type.empty:
             ax.scatter(df_type['Tm_lindemann'], df_type['Tm_clustering'],
-                      c=colors[type_key], marker=markers[type_key],
-                      label=labels[type_key], s=80, alpha=0.8)
+                      c=COLORS[type_key], marker=MARKERS[type_key],
+                      label=LABELS[type_key], s=80, alpha=0.8, rasterized=True)
     
     # 对角线
     if not df_both.empty:
@@ -669,23 +835,24 @@ def plot_melting_point_analysis(df_results):
         ax.set_xlim(lim_min, lim_max)
         ax.set_ylim(lim_min, lim_max)
     
-    ax.set_xlabel('$T_m$ (Lindemann) [K]', fontsize=11, fontweight='bold')
-    ax.set_ylabel('$T_m$ (Clustering) [K]', fontsize=11, fontweight='bold')
-    ax.set_title('(c) Comparison: Lindemann vs Clustering', fontsize=12, fontweight='bold')
-    ax.legend(fontsize=9)
+    ax.set_xlabel('$T_m$ (Lindemann) [K]')
+    ax.set_ylabel('$T_m$ (Clustering) [K]')
+    ax.set_title('(c) Comparison: Lindemann vs Clustering')
+    ax.legend()
     ax.grid(True, alpha=0.3)
     ax.set_aspect('equal')
     
     # --- (d) Tm difference histogram ---
     ax = axes[1, 1]
-    df_diff = df_both[~df_both['Tm_diff_lind_clust'].isna()]
+    df_diff = df_both.iloc[~np.isnan(df_both['Tm_diff_lind_clust'].to_numpy())]
     
     if not df_diff.empty:
+        diff_types = df_diff['type'].to_numpy()
         for type_key in ['supported', 'oxide']:
-            df_type = df_diff[df_diff['type'] == type_key]
+            df_type = df_diff.iloc[diff_types == type_key]
             if not df_type.empty:
-                ax.hist(df_type['Tm_diff_lind_clust'], bins=15, alpha=0.6,
-                       color=colors[type_key], label=labels[type_key],
+                ax.hist(df_type['Tm_diff_lind_clust'].to_numpy(), bins=15, alpha=0.6,
+                       color=COLORS[type_key], label=LABELS[type_key],
                        edgecolor='black')
         
         # 统计信息
@@ -695,63 +862,58 @@ def plot_melting_point_analysis(df_results):
                    label=f'Mean = {mean_diff:.1f} K')
         ax.axvline(0, color='black', linestyle='-', linewidth=1, alpha=0.5)
     
-    ax.set_xlabel('$\\Delta T_m$ = $T_m$(Lindemann) - $T_m$(Clustering) [K]', fontsize=11, fontweight='bold')
-    ax.set_ylabel('Count', fontsize=11, fontweight='bold')
-    ax.set_title('(d) $T_m$ Difference Distribution', fontsize=12, fontweight='bold')
-    ax.legend(fontsize=9)
+    ax.set_xlabel('$\\Delta T_m$ = $T_m$(Lindemann) - $T_m$(Clustering) [K]')
+    ax.set_ylabel('Count')
+    ax.set_title('(d) $T_m$ Difference Distribution')
+    ax.legend()
     ax.grid(True, alpha=0.3, axis='y')
     
     # --- (e) Tm vs Sn fraction - 所有类型 (支撑材料，应用筛选) ---
     ax = axes[2, 0]
     for type_key in ['air', 'supported', 'oxide']:
-        df_type = df_valid[
-            (df_valid['type'] == type_key) &
-            (~df_valid['structure'].str.lower().isin(exclude_list))  # 应用筛选
-        ]
-        if not df_type.empty:
-            ax.scatter(df_type['Sn_fraction'], df_type['Tm_lindemann'],
-                      c=colors[type_key], marker=markers[type_key],
-                      label=labels[type_key], s=80, alpha=0.8)
-    
-    ax.set_xlabel('Sn Fraction = Sn/(Pt+Sn+O)', fontsize=11, fontweight='bold')
-    ax.set_ylabel('Melting Point $T_m$ (K)', fontsize=11, fontweight='bold')
-    ax.set_title('(e) $T_m$ vs Sn Fraction (All Types)', fontsize=12, fontweight='bold')
-    ax.legend(fontsize=9)
+        sn_frac, _, tm = scatter_data[type_key]  # 已应用筛选
+        if len(tm) > 0:
+            ax.scatter(sn_frac, tm,
+                      c=COLORS[type_key], marker=MARKERS[type_key],
+                      label=LABELS[type_key], s=80, alpha=0.8, rasterized=True)
+    
+    ax.set_xlabel('Sn Fraction = Sn/(Pt+Sn+O)')
+    ax.set_ylabel('Melting Point $T_m$ (K)')
+    ax.set_title('(e) $T_m$ vs Sn Fraction (All Types)')
+    ax.legend()
     ax.grid(True, alpha=0.3)
     
     # --- (f) Tm vs total atoms - 所有类型 (支撑材料，应用筛选) ---
     ax = axes[2, 1]
     for type_key in ['air', 'supported', 'oxide']:
-        df_type = df_valid[
-            (df_valid['type'] == type_key) &
-            (~df_valid['structure'].str.lower().isin(exclude_list))  # 应用筛选
-        ]
-        if not df_type.empty:
-            ax.scatter(df_type['total_atoms'], df_type['Tm_lindemann'],
-                      c=colors[type_key], marker=markers[type_key],
-                      label=labels[type_key], s=80, alpha=0.8)
-    
-    ax.set_xlabel('Total Atoms (Pt + Sn + O)', fontsize=11, fontweight='bold')
-    ax.set_ylabel('Melting Point $T_m$ (K)', fontsize=11, fontweight='bold')
-    ax.set_title('(f) $T_m$ vs Total Atoms (All Types)', fontsize=12, fontweight='bold')
-    ax.legend(fontsize=9)
+        _, atoms, tm = scatter_data[type_key]  # 已应用筛选
+        if len(tm) > 0:
+            ax.scatter(atoms, tm,
+                      c=COLORS[type_key], marker=MARKERS[type_key],
+                      label=LABELS[type_key], s=80, alpha=0.8, rasterized=True)
+    
+    ax.set_xlabel('Total Atoms (Pt + Sn + O)')
+    ax.set_ylabel('Melting Point $T_m$ (K)')
+    ax.set_title('(f) $T_m$ vs Total Atoms (All Types)')
+    ax.legend()
     ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    
     output_file = OUTPUT_DIR / 'Tm_vs_composition.png'
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=200, bbox_inches='tight', pil_kwargs={'optimize': True})
     print(f"  [OK] Saved: {output_file}")
     plt.close()
     
     # ========================================================================
     # 图2: 含氧 vs 无氧对比
     # ========================================================================
-    fig, axes = plt.subplots(1, 2, figsize=(12, 5))
+    fig, axes = plt.subplots(1, 2, figsize=(12, 5), constrained_layout=True)
     
-    # --- 按是否含氧分组 ---
-    df_no_o = df_valid[df_valid['has_oxygen'] == False]
-    df_with_o = df_valid[df_valid['has_oxygen'] == True]
+    # --- 按是否含氧分组 (复用前面的 no_ox 掩码) ---
+    df_no_o = df_valid.iloc[no_ox]
+    df_with_o = df_valid.iloc[~no_ox]
+    # Tm 数组 (df_valid 已去除 NaN)，直接交给 boxplot / ttest
+    tm_no_o = scatter_data['no_oxygen'][2]
+    tm_with_o = scatter_data['with_oxygen'][2]
     
     # (a) 箱线图
     ax = axes[0]
@@ -759,10 +921,10 @@ def plot_melting_point_analysis(df_results):
     labels_box = []
     
     if not df_no_o.empty:
-        data_box.append(df_no_o['Tm_lindemann'].dropna().values)
+        data_box.append(tm_no_o)
         labels_box.append(f'No Oxygen\n(n={len(df_no_o)})')
     if not df_with_o.empty:
-        data_box.append(df_with_o['Tm_lindemann'].dropna().values)
+        data_box.append(tm_with_o)
         labels_box.append(f'With Oxygen\n(n={len(df_with_o)})')
     
     if data_box:
@@ -772,16 +934,13 @@ def plot_melting_point_analysis(df_results):
             patch.set_facecolor(color)
             patch.set_alpha(0.6)
     
-    ax.set_ylabel('Melting Point $T_m$ (K)', fontsize=11, fontweight='bold')
-    ax.set_title('(a) $T_m$ by Oxygen Content', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Melting Point $T_m$ (K)')
+    ax.set_title('(a) $T_m$ by Oxygen Content')
     ax.grid(True, alpha=0.3, axis='y')
     
     # 统计检验
     if len(df_no_o) > 1 and len(df_with_o) > 1:
-        t_stat, p_value = stats.ttest_ind(
-            df_no_o['Tm_lindemann'].dropna(),
-            df_with_o['Tm_lindemann'].dropna()
-        )
+        t_stat, p_value = stats.ttest_ind(tm_no_o, tm_with_o)
         ax.text(0.5, 0.95, f't-test p = {p_value:.4f}',
                transform=ax.transAxes, fontsize=10,
                verticalalignment='top', horizontalalignment='center',
@@ -790,155 +949,161 @@ def plot_melting_point_analysis(df_results):
     # (b) Sn fraction 对比
     ax = axes[1]
     if not df_no_o.empty:
-        ax.scatter(df_no_o['Sn_fraction'], df_no_o['Tm_lindemann'],
-                  c='#2E8B57', marker='s', s=80, label='No Oxygen', alpha=0.7)
+        ax.scatter(scatter_data['no_oxygen'][0], scatter_data['no_oxygen'][2],
+                  c='#2E8B57', marker='s', s=80, label='No Oxygen', alpha=0.7,
+                  rasterized=True)
     if not df_with_o.empty:
-        ax.scatter(df_with_o['Sn_fraction'], df_with_o['Tm_lindemann'],
-                  c='#FF6347', marker='^', s=80, label='With Oxygen', alpha=0.7)
-    
-    ax.set_xlabel('Sn Fraction = Sn/(Pt+Sn+O)', fontsize=11, fontweight='bold')
-    ax.set_ylabel('Melting Point $T_m$ (K)', fontsize=11, fontweight='bold')
-    ax.set_title('(b) $T_m$ vs Sn Fraction (by Oxygen)', fontsize=12, fontweight='bold')
-    ax.legend(fontsize=9)
+        ax.scatter(scatter_data['with_oxygen'][0], scatter_data['with_oxygen'][2],
+                  c='#FF6347', marker='^', s=80, label='With Oxygen', alpha=0.7,
+                  rasterized=True)
+    
+    ax.set_xlabel('Sn Fraction = Sn/(Pt+Sn+O)')
+    ax.set_ylabel('Melting Point $T_m$ (K)')
+    ax.set_title('(b) $T_m$ vs Sn Fraction (by Oxygen)')
+    ax.legend()
     ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    
     output_file = OUTPUT_DIR / 'Tm_oxygen_comparison.png'
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=200, bbox_inches='tight', pil_kwargs={'optimize': True})
     print(f"  [OK] Saved: {output_file}")
     plt.close()
     
     # ========================================================================
     # 图3: Pt8SnX 和 Pt6SnX 系列分析 (仅负载型无氧合金)
     # ========================================================================
-    fig, axes = plt.subplots(1, 3, figsize=(16, 5))
-    
-    # 获取屏蔽列表
-    exclude_list = [s.lower() for s in args.exclude]
+    fig, axes = plt.subplots(1, 3, figsize=(16, 5), constrained_layout=True)
     
     # Pt8SnX 系列 - 仅负载型无氧合金 (排除 Air, 排除氧化物, 排除屏蔽的结构)
     ax = axes[0]
-    df_pt8 = df_valid[
-        (df_valid['Pt'] == 8) & 
-        (df_valid['O'] == 0) & 
-        (df_valid['type'] == 'supported') &  # 只要负载型
-        (~df_valid['structure'].str.lower().isin(exclude_list))  # 排除屏蔽的结构
-    ].copy()
-    
-    if not df_pt8.empty:
-        df_pt8_sorted = df_pt8.sort_values('Sn')
-        ax.plot(df_pt8_sorted['Sn'], df_pt8_sorted['Tm_lindemann'],
+    
+    sn, tm = series_data['pt8']
+    if len(sn) > 0:
+        ax.plot(sn, tm,
                'o-', color='black', markersize=10,
                linewidth=2, label=r'Pt$_8$Sn$_x$')
         
         # 线性拟合
-        if len(df_pt8_sorted) > 2:
-            slope, intercept, r, p, se = stats.linregress(
-                df_pt8_sorted['Sn'], df_pt8_sorted['Tm_lindemann']
-            )
-            x_fit = np.linspace(df_pt8_sorted['Sn'].min(), df_pt8_sorted['Sn'].max(), 100)
+        if 'pt8' in fits:
+            slope, intercept, r, p = fits['pt8']
+            x_fit = np.array([sn[0], sn[-1]])  # 直线只需两个端点
             y_fit = slope * x_fit + intercept
             ax.plot(x_fit, y_fit, '--', color='gray', alpha=0.7,
                    label=f'Fit: slope={slope:.1f} K/Sn, R²={r**2:.3f}')
     
-    ax.set_xlabel('Sn Atoms (x)', fontsize=11, fontweight='bold')
-    ax.set_ylabel('Melting Point $T_m$ (K)', fontsize=11, fontweight='bold')
-    ax.set_title(r'(a) Pt$_8$Sn$_x$ Series', fontsize=12, fontweight='bold')
-    ax.legend(fontsize=9, loc='best')
+    ax.set_xlabel('Sn Atoms (x)')
+    ax.set_ylabel('Melting Point $T_m$ (K)')
+    ax.set_title(r'(a) Pt$_8$Sn$_x$ Series')
+    ax.legend(loc='best')
     ax.grid(False)
     
     # Pt6SnX 系列 - 仅负载型无氧合金
     ax = axes[1]
-    df_pt6 = df_valid[
-        (df_valid['Pt'] == 6) & 
-        (df_valid['O'] == 0) & 
-        (df_valid['type'] == 'supported') &  # 只要负载型
-        (~df_valid['structure'].str.lower().isin(exclude_list))  # 排除屏蔽的结构
-    ].copy()
-    
-    if not df_pt6.empty:
-        df_pt6_sorted = df_pt6.sort_values('Sn')
-        ax.plot(df_pt6_sorted['Sn'], df_pt6_sorted['Tm_lindemann'],
+    
+    sn, tm = series_data['pt6']
+    if len(sn) > 0:
+        ax.plot(sn, tm,
                'o-', color='black', markersize=10,
                linewidth=2, label=r'Pt$_6$Sn$_x$')
         
         # 线性拟合
-        if len(df_pt6_sorted) > 2:
-            slope, intercept, r, p, se = stats.linregress(
-                df_pt6_sorted['Sn'], df_pt6_sorted['Tm_lindemann']
-            )
-            x_fit = np.linspace(df_pt6_sorted['Sn'].min(), df_pt6_sorted['Sn'].max(), 100)
+        if 'pt6' in fits:
+            slope, intercept, r, p = fits['pt6']
+            x_fit = np.array([sn[0], sn[-1]])
             y_fit = slope * x_fit + intercept
             ax.plot(x_fit, y_fit, '--', color='gray', alpha=0.7,
                    label=f'Fit: slope={slope:.1f} K/Sn, R²={r**2:.3f}')
     
-    ax.set_xlabel('Sn Atoms (x)', fontsize=11, fontweight='bold')
-    ax.set_ylabel('Melting Point $T_m$ (K)', fontsize=11, fontweight='bold')
-    ax.set_title(r'(b) Pt$_6$Sn$_x$ Series', fontsize=12, fontweight='bold')
-    ax.legend(fontsize=9, loc='best')
+    ax.set_xlabel('Sn Atoms (x)')
+    ax.set_ylabel('Melting Point $T_m$ (K)')
+    ax.set_title(r'(b) Pt$_6$Sn$_x$ Series')
+    ax.legend(loc='best')
     ax.grid(False)
     
     # 总原子数为8的系列 (Pt+Sn=8, 无氧, 负载型)
     ax = axes[2]
-    df_total8 = df_valid[
-        ((df_valid['Pt'] + df_valid['Sn']) == 8) & 
-        (df_valid['O'] == 0) & 
-        (df_valid['type'] == 'supported') &  # 只要负载型
-        (~df_valid['structure'].str.lower().isin(exclude_list))  # 排除屏蔽的结构
-    ].copy()
-    
-    if not df_total8.empty:
-        df_total8_sorted = df_total8.sort_values('Sn')
-        ax.plot(df_total8_sorted['Sn'], df_total8_sorted['Tm_lindemann'],
+    
+    sn, tm = series_data['total8']
+    if len(sn) > 0:
+        ax.plot(sn, tm,
                'o-', color='black', markersize=10,
                linewidth=2, label=r'Pt$_{8-x}$Sn$_x$')
         
         # 线性拟合
-        if len(df_total8_sorted) > 2:
-            slope, intercept, r, p, se = stats.linregress(
-                df_total8_sorted['Sn'], df_total8_sorted['Tm_lindemann']
-            )
-            x_fit = np.linspace(df_total8_sorted['Sn'].min(), df_total8_sorted['Sn'].max(), 100)
+        if 'total8' in fits:
+            slope, intercept, r, p = fits['total8']
+            x_fit = np.array([sn[0], sn[-1]])
             y_fit = slope * x_fit + intercept
             ax.plot(x_fit, y_fit, '--', color='gray', alpha=0.7,
                    label=f'Fit: slope={slope:.1f} K/Sn, R²={r**2:.3f}')
     
-    ax.set_xlabel('Sn Atoms (x)', fontsize=11, fontweight='bold')
-    ax.set_ylabel('Melting Point $T_m$ (K)', fontsize=11, fontweight='bold')
-    ax.set_title(r'(c) Pt$_{8-x}$Sn$_x$ Series (Total=8)', fontsize=12, fontweight='bold')
-    ax.legend(fontsize=9, loc='best')
+    ax.set_xlabel('Sn Atoms (x)')
+    ax.set_ylabel('Melting Point $T_m$ (K)')
+    ax.set_title(r'(c) Pt$_{8-x}$Sn$_x$ Series (Total=8)')
+    ax.legend(loc='best')
     ax.grid(False)
     
-    plt.tight_layout()
-    
     output_file = OUTPUT_DIR / 'Tm_series_analysis.png'
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=200, bbox_inches='tight', pil_kwargs={'optimize': True})
     print(f"  [OK] Saved: {output_file}")
     plt.close()
+    
+    return {
+        'valid': df_valid,
+        'both': df_both,
+        'no_o': df_no_o,
+        'with_o': df_with_o,
+    }
 
 
 # ============================================================================
 # 6. 生成报告
 # ============================================================================
 
-def generate_report(df_results):
+def tm_summary(df_subset):
+    """
+    Tm_lindemann 的均值、样本标准差 (ddof=1，与 pandas 一致) 和个数
+    
+    一次取出 ndarray 去掉 NaN 后用 numpy 归约，避免多次 pandas 归约。
+    """
+    v = df_subset['Tm_lindemann'].to_numpy()
+    v = v[~np.isnan(v)]
+    mean = v.mean() if v.size > 0 else np.nan
+    std = v.std(ddof=1) if v.size > 1 else np.nan
+    return mean, std, v.size
+
+
+def generate_report(df_results, cached=None):
     """
     生成分析报告
+    
+    Args:
+        df_results: analyze_all_melting_points() 的结果表
+        cached: plot_melting_point_analysis() 返回的子表字典；
+                为 None 时在此重新筛选
     """
     print(f"\n[4] Generating report...")
     
-    df_valid = df_results[~df_results['Tm_lindemann'].isna()]
-    df_both = df_valid[~df_valid['Tm_clustering'].isna()]
+    if cached is not None:
+        df_valid = cached['valid']
+        df_both = cached['both']
+        df_no_o = cached['no_o']
+        df_with_o = cached['with_o']
+    else:
+        df_valid = df_results.iloc[~np.isnan(df_results['Tm_lindemann'].to_numpy())]
+        df_both = df_valid.iloc[~np.isnan(df_valid['Tm_clustering'].to_numpy())]
+        # 含氧 vs 无氧
+        no_ox = df_valid['has_oxygen'].to_numpy() == False
+        df_no_o = df_valid.iloc[no_ox]
+        df_with_o = df_valid.iloc[~no_ox]
     
     # 统计
     n_total = len(df_results)
     n_valid = len(df_valid)
     
-    # 按类型统计
-    type_stats = df_valid.groupby('type').agg({
-        'Tm_lindemann': ['mean', 'std', 'min', 'max', 'count']
-    }).round(1)
+    # 按类型统计 (一次 groupby 得到报告表格所需的全部统计量)
+    type_stats = df_valid.groupby('type')['Tm_lindemann'].agg(
+        ['mean', 'std', 'min', 'max', 'size']
+    )
     
     # 两种方法对比
     if len(df_both) > 0:
@@ -948,11 +1113,21 @@ def generate_report(df_results):
     else:
         mean_diff = std_diff = corr = np.nan
     
-    # 含氧 vs 无氧
-    df_no_o = df_valid[df_valid['has_oxygen'] == False]
-    df_with_o = df_valid[df_valid['has_oxygen'] == True]
+    # 含氧 / 无氧两组的 Tm 统计
+    no_o_mean, no_o_std, no_o_n = tm_summary(df_no_o)
+    with_o_mean, with_o_std, with_o_n = tm_summary(df_with_o)
+    
+    # Pt8SnX / Pt6SnX 系列线性拟合 (无氧, 点数 > 2)，两组一次批量计算
+    pt_arr = df_valid['Pt'].to_numpy()
+    o_free = df_valid['O'].to_numpy() == 0
+    df_pt8 = df_valid.iloc[(pt_arr == 8) & o_free]
+    df_pt6 = df_valid.iloc[(pt_arr == 6) & o_free]
+    series_inputs = {key: (df_s['Sn'].to_numpy(), df_s['Tm_lindemann'].to_numpy())
+                     for key, df_s in [('pt8', df_pt8), ('pt6', df_pt6)] if len(df_s) > 2}
+    series_fits = dict(zip(series_inputs, batch_linregress(list(series_inputs.values()))))
     
-    report = f"""# Melting Point Analysis Report
+    # 各段先收集到列表，最后一次性拼接
+    parts = [f"""# Melting Point Analysis Report
 
 **Generated**: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}
 
@@ -990,24 +1165,24 @@ def generate_report(df_results):
 
 | Type | Mean Tm (K) | Std (K) | Min (K) | Max (K) | Count |
 |------|-------------|---------|---------|---------|-------|
-"""
+"""]
     
     for type_key in ['air', 'supported', 'oxide']:
-        df_type = df_valid[df_valid['type'] == type_key]
-        if not df_type.empty:
-            report += f"| {type_key.capitalize()} | {df_type['Tm_lindemann'].mean():.1f} | {df_type['Tm_lindemann'].std():.1f} | {df_type['Tm_lindemann'].min():.1f} | {df_type['Tm_lindemann'].max():.1f} | {len(df_type)} |\n"
+        if type_key in type_stats.index:
+            t_mean, t_std, t_min, t_max, t_n = type_stats.loc[type_key]
+            parts.append(f"| {type_key.capitalize()} | {t_mean:.1f} | {t_std:.1f} | {t_min:.1f} | {t_max:.1f} | {int(t_n)} |\n")
     
-    report += f"""
+    parts.append(f"""
 ---
 
 ## 4. Oxygen Effect Analysis
 
 | Group | Mean Tm (K) | Std (K) | Count |
 |-------|-------------|---------|-------|
-| Without Oxygen | {df_no_o['Tm_lindemann'].mean():.1f} | {df_no_o['Tm_lindemann'].std():.1f} | {len(df_no_o)} |
-| With Oxygen | {df_with_o['Tm_lindemann'].mean():.1f} | {df_with_o['Tm_lindemann'].std():.1f} | {len(df_with_o)} |
+| Without Oxygen | {no_o_mean:.1f} | {no_o_std:.1f} | {no_o_n} |
+| With Oxygen | {with_o_mean:.1f} | {with_o_std:.1f} | {with_o_n} |
 
-"""
+""")
     
     # t-test
     if len(df_no_o) > 1 and len(df_with_o) > 1:
@@ -1015,61 +1190,64 @@ def generate_report(df_results):
             df_no_o['Tm_lindemann'].dropna(),
             df_with_o['Tm_lindemann'].dropna()
         )
-        report += f"**t-test**: t = {t_stat:.3f}, p = {p_value:.4f}\n\n"
+        parts.append(f"**t-test**: t = {t_stat:.3f}, p = {p_value:.4f}\n\n")
         if p_value < 0.05:
-            report += "> ⚠️ **Significant difference** between oxygen-containing and oxygen-free structures (p < 0.05)\n"
+            parts.append("> ⚠️ **Significant difference** between oxygen-containing and oxygen-free structures (p < 0.05)\n")
         else:
-            report += "> ✅ No significant difference (p ≥ 0.05)\n"
+            parts.append("> ✅ No significant difference (p ≥ 0.05)\n")
     
-    report += f"""
+    parts.append(f"""
 ---
 
 ## 5. Series Analysis
 
 ### Pt₈Snₓ Series
-"""
-    df_pt8 = df_valid[(df_valid['Pt'] == 8) & (df_valid['O'] == 0)]
-    if not df_pt8.empty and len(df_pt8) > 2:
-        slope, intercept, r, p, se = stats.linregress(df_pt8['Sn'], df_pt8['Tm_lindemann'])
-        report += f"- Linear fit: Tm = {slope:.1f} × Sn + {intercept:.1f}\n"
-        report += f"- R² = {r**2:.4f}\n"
-        report += f"- **Effect of Sn**: {slope:.1f} K per Sn atom\n"
-    
-    report += f"""
+""")
+    if 'pt8' in series_fits:
+        slope, intercept, r, p = series_fits['pt8']
+        parts.append(f"- Linear fit: Tm = {slope:.1f} × Sn + {intercept:.1f}\n")
+        parts.append(f"- R² = {r**2:.4f}\n")
+        parts.append(f"- **Effect of Sn**: {slope:.1f} K per Sn atom\n")
+    
+    parts.append(f"""
 ### Pt₆Snₓ Series
-"""
-    df_pt6 = df_valid[(df_valid['Pt'] == 6) & (df_valid['O'] == 0)]
-    if not df_pt6.empty and len(df_pt6) > 2:
-        slope, intercept, r, p, se = stats.linregress(df_pt6['Sn'], df_pt6['Tm_lindemann'])
-        report += f"- Linear fit: Tm = {slope:.1f} × Sn + {intercept:.1f}\n"
-        report += f"- R² = {r**2:.4f}\n"
-        report += f"- **Effect of Sn**: {slope:.1f} K per Sn atom\n"
-    
-    report += f"""
+""")
+    if 'pt6' in series_fits:
+        slope, intercept, r, p = series_fits['pt6']
+        parts.append(f"- Linear fit: Tm = {slope:.1f} × Sn + {intercept:.1f}\n")
+        parts.append(f"- R² = {r**2:.4f}\n")
+        parts.append(f"- **Effect of Sn**: {slope:.1f} K per Sn atom\n")
+    
+    parts.append(f"""
 ---
 
 ## 6. Full Results Table
 
 | Structure | Type | Pt | Sn | O | Tm (Lindemann) | Tm (Transition) | Tm (Clustering) | Δ(L-T) |
 |-----------|------|----|----|---|----------------|-----------------|-----------------|--------|
-"""
-    
-    for _, row in df_results.iterrows():
-        Tm_L = f"{row['Tm_lindemann']:.0f}" if not np.isnan(row['Tm_lindemann']) else "N/A"
-        Tm_T = f"{row['Tm_transition']:.0f}" if not np.isnan(row.get('Tm_transition', np.nan)) else "N/A"
-        Tm_C = f"{row['Tm_clustering']:.0f}" if not np.isnan(row['Tm_clustering']) else "N/A"
-        diff = f"{row['Tm_diff_lind_trans']:.0f}" if not np.isnan(row.get('Tm_diff_lind_trans', np.nan)) else "N/A"
-        report += f"| {row['structure']} | {row['type']} | {row['Pt']} | {row['Sn']} | {row['O']} | {Tm_L} | {Tm_T} | {Tm_C} | {diff} |\n"
+""")
+    
+    def fmt_tm(v):
+        # NaN 自身不相等，省去 np.isnan 调用
+        return "N/A" if v != v else f"{v:.0f}"
+    
+    table_cols = ['structure', 'type', 'Pt', 'Sn', 'O',
+                  'Tm_lindemann', 'Tm_transition', 'Tm_clustering', 'Tm_diff_lind_trans']
+    parts.extend(
+        f"| {name} | {type_key} | {pt} | {sn} | {o} | "
+        f"{fmt_tm(Tm_L)} | {fmt_tm(Tm_T)} | {fmt_tm(Tm_C)} | {fmt_tm(diff)} |\n"
+        for name, type_key, pt, sn, o, Tm_L, Tm_T, Tm_C, diff in df_results[table_cols].to_numpy()
+    )
     
-    report += """
+    parts.append("""
 ---
 
 *Report generated by step5_1_melting_point_analysis.py*
-"""
+""")
     
     output_file = OUTPUT_DIR / 'MELTING_POINT_ANALYSIS_REPORT.md'
     with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(report)
+        f.write(''.join(parts))
     print(f"  [OK] Saved: {output_file}")
 
 
@@ -1085,30 +1263,35 @@ def main():
         print("[ERROR] No results to analyze")
         return
     
-    # 2. 可视化
-    plot_melting_point_analysis(df_results)
+    # 2. 可视化 (返回筛选好的子表，报告和摘要直接复用)
+    cached = plot_melting_point_analysis(df_results)
     
     # 3. 生成报告
-    generate_report(df_results)
+    generate_report(df_results, cached=cached)
     
     # 4. 打印摘要
     print("\n" + "=" * 70)
     print("SUMMARY")
     print("=" * 70)
     
-    df_valid = df_results[~df_results['Tm_lindemann'].isna()]
+    if cached is not None:
+        df_valid = cached['valid']
+    else:
+        df_valid = df_results.iloc[~np.isnan(df_results['Tm_lindemann'].to_numpy())]
     
     print(f"\nMelting Point Statistics (Lindemann method):")
-    print(f"  Total structures with Tm: {len(df_valid)}")
-    print(f"  Mean Tm: {df_valid['Tm_lindemann'].mean():.1f} ± {df_valid['Tm_lindemann'].std():.1f} K")
+    tm_mean, tm_std, tm_n = tm_summary(df_valid)
+    print(f"  Total structures with Tm: {tm_n}")
+    print(f"  Mean Tm: {tm_mean:.1f} ± {tm_std:.1f} K")
     print(f"  Range: {df_valid['Tm_lindemann'].min():.0f} - {df_valid['Tm_lindemann'].max():.0f} K")
     
     # 按类型
     print(f"\nBy structure type:")
+    type_stats = df_valid.groupby('type')['Tm_lindemann'].agg(['mean', 'std', 'size'])
     for type_key in ['air', 'supported', 'oxide']:
-        df_type = df_valid[df_valid['type'] == type_key]
-        if not df_type.empty:
-            print(f"  {type_key.capitalize():12s}: {df_type['Tm_lindemann'].mean():.1f} ± {df_type['Tm_lindemann'].std():.1f} K (n={len(df_type)})")
+        if type_key in type_stats.index:
+            t_mean, t_std, t_n = type_stats.loc[type_key]
+            print(f"  {type_key.capitalize():12s}: {t_mean:.1f} ± {t_std:.1f} K (n={int(t_n)})")
     
     print("\n" + "=" * 70)
     print("Done!")
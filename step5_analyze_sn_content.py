@@ -12,15 +12,40 @@
 5. 统计对比表
 """
 
+import re
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # 只输出PNG, 使用无界面后端
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 from pathlib import Path
-from scipy import stats
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+# 可选: pyarrow 多线程CSV解析
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# 可选: numba 编译分组拟合内核
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# 可选: numexpr 多线程逐元素计算
+try:
+    import numexpr as ne
+    HAS_NUMEXPR = True
+except ImportError:
+    HAS_NUMEXPR = False
+
 # ===== 閰嶇疆 =====
 BASE_DIR = Path(__file__).parent
 DATA_FILE = BASE_DIR / 'results' / 'ensemble_D_analysis' / 'ensemble_D_values.csv'
@@ -34,48 +59,72 @@ COLORS = {
     'PtSn': '#2ECC71'
 }
 
+# 元素顺序
+ELEMENTS = ['Pt', 'Sn', 'PtSn']
+
 # 温度列表
 TEMPS = [200, 300, 400, 500, 600, 700, 800, 900, 1000, 1100]
 
-plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+# Sn含量颜色查找表 (Sn含量: 0-10), 按Sn含量直接索引
+SN_VALUES = np.arange(0, 11)
+SN_COLOR_LUT = plt.cm.viridis(SN_VALUES / len(SN_VALUES))
 
+# 输出分辨率: 多子图中间结果用150 dpi, 活化能汇总图保留300 dpi
+GRID_DPI = 150
+SUMMARY_DPI = 300
+# 行数达到此值才使用numexpr (小数组时其启动开销占主导)
+NUMEXPR_MIN_ROWS = 10000
 
-def extract_sn_content(composition):
-    """
-    从组成名称提取Sn含量
-    
-    Examples:
-    ---------
-    pt8sn0-2-best -> 0
-    pt8sn5-1-best -> 5
-    pt8sn10-2-best -> 10
-    """
-    import re
-    match = re.search(r'pt8sn(\d+)', composition, re.IGNORECASE)
-    if match:
-        return int(match.group(1))
-    return None
+# PNG使用低压缩级别, 写入更快 (文件略大)
+PNG_PIL_KWARGS = {'optimize': False, 'compress_level': 1}
+
+plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
+plt.rcParams['axes.unicode_minus'] = False
+plt.rcParams['interactive'] = False
+# 路径简化与分块渲染, 加快高DPI图片的栅格化
+plt.rcParams['path.simplify'] = True
+plt.rcParams['path.simplify_threshold'] = 1.0
+plt.rcParams['agg.path.chunksize'] = 10000
 
 
 def load_and_prepare_data():
     """加载并预处理数据"""
     print("\n[*] Loading data...")
-    df = pd.read_csv(DATA_FILE)
-    
-    # 添加Sn含量列
-    df['sn_content'] = df['composition'].apply(extract_sn_content)
+    # 只解析用到的列, 读取时直接使用紧凑类型, 避免先升精度再降精度
+    read_kwargs = dict(
+        usecols=['composition', 'element', 'temp_K', 'D_cm2_s'],
+        dtype={'temp_K': 'int16', 'D_cm2_s': 'float32'},
+        engine='pyarrow' if HAS_PYARROW else 'c',
+    )
+    df = pd.read_csv(DATA_FILE, **read_kwargs)
+    
+    # 低基数字符串列转为分类类型, 比较与分组直接使用整数编码
+    df['element'] = df['element'].astype(pd.CategoricalDtype(ELEMENTS, ordered=True))
+    df['composition'] = df['composition'].astype('category')
+    
+    # 添加Sn含量列 (向量化正则提取, 如 pt8sn5-1-best -> 5)
+    df['sn_content'] = df['composition'].str.extract(
+        r'pt8sn(\d+)', flags=re.IGNORECASE, expand=False
+    ).astype('float64')
     
     # 过滤掉无法识别Sn含量的数据
-    df = df[df['sn_content'].notna()]
+    df = df[df['sn_content'].notna()].copy()
+    df['sn_content'] = df['sn_content'].astype('int8')
     
     # 添加倒数温度 (用于Arrhenius图)
-    df['inv_T_1000K'] = 1000.0 / df['temp_K']  # 1000/T (K^-1)
+    df['inv_T_1000K'] = (1000.0 / df['temp_K']).astype('float32')  # 1000/T (K^-1)
     
-    # 添加ln(D) (只对正D值)
-    df['ln_D'] = np.nan
-    positive_D = df['D_cm2_s'] > 0
-    df.loc[positive_D, 'ln_D'] = np.log(df.loc[positive_D, 'D_cm2_s'])
+    # 添加ln(D) (只对正D值, float32输入得到float32结果)
+    if HAS_NUMEXPR and len(df) >= NUMEXPR_MIN_ROWS:
+        D = df['D_cm2_s'].to_numpy()
+        ln_D = ne.evaluate('where(D > 0, log(D), nan)',
+                           local_dict={'D': D, 'nan': np.nan})
+        df['ln_D'] = ln_D.astype(np.float32, copy=False)
+    else:
+        df['ln_D'] = np.log(df['D_cm2_s'].where(df['D_cm2_s'] > 0))
+    
+    # 只排序一次, 之后各分组子表天然按Sn含量和温度有序
+    df = df.sort_values(['element', 'sn_content', 'temp_K'], kind='stable', ignore_index=True)
     
     print(f"  [OK] Loaded {len(df)} data points")
     print(f"  Sn content range: {df['sn_content'].min():.0f} - {df['sn_content'].max():.0f}")
@@ -99,14 +148,18 @@ def plot_D_vs_sn_content(df, output_dir):
     n_cols = 3
     n_rows = (n_temps + n_cols - 1) // n_cols
     
-    fig, axes = plt.subplots(n_rows, n_cols, figsize=(18, 5*n_rows))
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(18, 5*n_rows),
+                             constrained_layout=True)
     axes = axes.flatten()
     
+    # 一次分组 (df已按Sn含量排序), 子图内只需字典查找
+    by_temp_elem = dict(tuple(df.groupby(['temp_K', 'element'], observed=True)))
+    temps_with_data = {temp for temp, _ in by_temp_elem}
+    
     for idx, temp in enumerate(selected_temps):
         ax = axes[idx]
-        df_temp = df[df['temp_K'] == temp]
         
-        if len(df_temp) == 0:
+        if temp not in temps_with_data:
             ax.text(0.5, 0.5, 'No Data', ha='center', va='center',
                    transform=ax.transAxes, fontsize=14)
             ax.set_title(f'{temp}K', fontsize=12, fontweight='bold')
@@ -114,14 +167,11 @@ def plot_D_vs_sn_content(df, output_dir):
         
         # 按元素绘制
         for element in ['Pt', 'Sn', 'PtSn']:
-            df_elem = df_temp[df_temp['element'] == element]
+            df_elem = by_temp_elem.get((temp, element))
             
-            if len(df_elem) == 0:
+            if df_elem is None:
                 continue
             
-            # 按Sn含量排序
-            df_elem = df_elem.sort_values('sn_content')
-            
             # 绘制数据点和曲线
             ax.plot(df_elem['sn_content'], df_elem['D_cm2_s'], 
                    'o-', label=element, color=COLORS[element],
@@ -144,10 +194,9 @@ def plot_D_vs_sn_content(df, output_dir):
                 'Pt8SnX Series at Different Temperatures',
                 fontsize=14, fontweight='bold')
     
-    plt.tight_layout()
-    
     output_file = output_dir / 'D_vs_SnContent_by_temperature.png'
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=GRID_DPI, bbox_inches='tight',
+                pil_kwargs=PNG_PIL_KWARGS)
     plt.close(fig)
     
     print(f"  [OK] Saved: {output_file.name}")
@@ -160,40 +209,46 @@ def plot_D_vs_temperature_comparison(df, output_dir):
     """
     print("\n[*] Plotting D vs Temperature (Sn content comparison)...")
     
-    fig, axes = plt.subplots(1, 3, figsize=(20, 6))
+    fig, axes = plt.subplots(1, 3, figsize=(20, 6), constrained_layout=True)
     
-    # 定义颜色映射 (Sn含量: 0-10)
-    cmap = plt.cm.viridis
     sn_contents = sorted(df['sn_content'].unique())
-    colors_sn = {sn: cmap(i/len(sn_contents)) for i, sn in enumerate(sn_contents)}
+    
+    # 一次分组 (df已按温度排序), 子图内只需字典查找
+    by_elem_sn = dict(tuple(df.groupby(['element', 'sn_content'], observed=True)))
+    elements_with_data = {element for element, _ in by_elem_sn}
     
     for idx, element in enumerate(['Pt', 'Sn', 'PtSn']):
         ax = axes[idx]
-        df_elem = df[df['element'] == element]
         
-        if len(df_elem) == 0:
+        if element not in elements_with_data:
             ax.text(0.5, 0.5, 'No Data', ha='center', va='center',
                    transform=ax.transAxes, fontsize=14)
             ax.set_title(f'{element}', fontsize=12, fontweight='bold')
             continue
         
-        # 按Sn含量分组绘制
-        for sn in sn_contents:
-            df_sn = df_elem[df_elem['sn_content'] == sn]
-            df_sn = df_sn.sort_values('temp_K')
-            
-            if len(df_sn) == 0:
-                continue
-            
-            ax.plot(df_sn['temp_K'], df_sn['D_cm2_s'],
-                   'o-', label=f'Sn{int(sn)}', 
-                   color=colors_sn[sn],
-                   markersize=6, linewidth=2, alpha=0.7)
+        # 按Sn含量分组: 整个子图只添加一个 LineCollection 和一个 scatter
+        sn_plotted = [sn for sn in sn_contents if (element, sn) in by_elem_sn]
+        segments = [np.column_stack([by_elem_sn[(element, sn)]['temp_K'].to_numpy(dtype=float),
+                                     by_elem_sn[(element, sn)]['D_cm2_s'].to_numpy(dtype=float)])
+                    for sn in sn_plotted]
+        line_colors = SN_COLOR_LUT.take(sn_plotted, axis=0, mode='clip')
+        
+        ax.add_collection(LineCollection(segments, colors=line_colors,
+                                         linewidths=2, alpha=0.7))
+        points = np.concatenate(segments)
+        point_colors = np.repeat(line_colors, [len(seg) for seg in segments], axis=0)
+        ax.scatter(points[:, 0], points[:, 1], c=point_colors, s=6**2, alpha=0.7)
+        ax.autoscale_view()
+        
+        # 图例使用代理句柄
+        handles = [Line2D([], [], marker='o', color=color, markersize=6,
+                          linewidth=2, alpha=0.7, label=f'Sn{int(sn)}')
+                   for sn, color in zip(sn_plotted, line_colors)]
         
         ax.set_xlabel('Temperature (K)', fontsize=11, fontweight='bold')
         ax.set_ylabel('D (cm²/s)', fontsize=11, fontweight='bold')
         ax.set_title(f'{element}', fontsize=12, fontweight='bold', color=COLORS[element])
-        ax.legend(fontsize=8, ncol=2, loc='upper left')
+        ax.legend(handles=handles, fontsize=8, ncol=2, loc='upper left')
         ax.grid(True, alpha=0.3)
         ax.ticklabel_format(style='sci', axis='y', scilimits=(0,0))
         ax.set_xlim(150, 1150)
@@ -202,15 +257,109 @@ def plot_D_vs_temperature_comparison(df, output_dir):
                 'Comparison of Different Sn Contents (Pt8SnX)',
                 fontsize=14, fontweight='bold')
     
-    plt.tight_layout()
-    
     output_file = output_dir / 'D_vs_Temperature_SnContent_comparison.png'
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=GRID_DPI, bbox_inches='tight',
+                pil_kwargs=PNG_PIL_KWARGS)
     plt.close(fig)
     
     print(f"  [OK] Saved: {output_file.name}")
 
 
+def _arrhenius_fit_kernel(x, y, offsets, out_slope, out_intercept, out_r2):
+    """
+    逐组最小二乘拟合内核 (安装numba时编译为机器码)
+    
+    第 g 组的数据为 x[offsets[g]:offsets[g+1]], 先求均值再累加中心化平方和,
+    结果写入 out_slope / out_intercept / out_r2。
+    """
+    for g in range(len(offsets) - 1):
+        lo = offsets[g]
+        hi = offsets[g + 1]
+        n = hi - lo
+        
+        sx = 0.0
+        sy = 0.0
+        for i in range(lo, hi):
+            sx += x[i]
+            sy += y[i]
+        x_mean = sx / n
+        y_mean = sy / n
+        
+        ss_xx = 0.0
+        ss_yy = 0.0
+        ss_xy = 0.0
+        for i in range(lo, hi):
+            dx = x[i] - x_mean
+            dy = y[i] - y_mean
+            ss_xx += dx * dx
+            ss_yy += dy * dy
+            ss_xy += dx * dy
+        
+        slope = ss_xy / ss_xx if ss_xx > 0 else np.nan
+        out_slope[g] = slope
+        out_intercept[g] = y_mean - slope * x_mean
+        denom = ss_xx * ss_yy
+        out_r2[g] = ss_xy * ss_xy / denom if denom > 0 else 0.0
+
+
+if HAS_NUMBA:
+    _arrhenius_fit_kernel = njit(cache=True)(_arrhenius_fit_kernel)
+
+
+def fit_arrhenius_groups(df_high_temp):
+    """
+    按 (element, sn_content) 分组批量拟合 ln(D) = slope * (1000/T) + intercept
+    
+    df_high_temp 需已按 (element, sn_content) 排序 (见 load_and_prepare_data),
+    由键值变化处得到各组在连续数组中的起点,
+    再用 np.add.reduceat 一次求出各组的 n、均值和中心化的 Σdx²、Σdy²、Σdxdy
+    (安装numba时改用编译后的 _arrhenius_fit_kernel 单次循环完成),
+    结果与逐组调用 stats.linregress 一致。
+    
+    Returns:
+    --------
+    dict: {(element, sn_content): (slope, intercept, r2)}, 只包含点数 ≥3 的组
+    """
+    if len(df_high_temp) == 0:
+        return {}
+    
+    elem = df_high_temp['element'].to_numpy()
+    sn = df_high_temp['sn_content'].to_numpy()
+    x = df_high_temp['inv_T_1000K'].to_numpy(dtype=np.float64)
+    y = df_high_temp['ln_D'].to_numpy(dtype=np.float64)
+    
+    # 分组边界: 键值发生变化的位置
+    is_start = np.ones(len(x), dtype=bool)
+    is_start[1:] = (elem[1:] != elem[:-1]) | (sn[1:] != sn[:-1])
+    starts = np.flatnonzero(is_start)
+    n = np.diff(np.append(starts, len(x)))
+    
+    if HAS_NUMBA:
+        offsets = np.append(starts, len(x))
+        slope = np.empty(len(starts))
+        intercept = np.empty(len(starts))
+        r2 = np.empty(len(starts))
+        _arrhenius_fit_kernel(x, y, offsets, slope, intercept, r2)
+    else:
+        x_mean = np.add.reduceat(x, starts) / n
+        y_mean = np.add.reduceat(y, starts) / n
+        gid = np.repeat(np.arange(len(starts)), n)
+        dx = x - x_mean[gid]
+        dy = y - y_mean[gid]
+        ss_xx = np.add.reduceat(dx * dx, starts)
+        ss_yy = np.add.reduceat(dy * dy, starts)
+        ss_xy = np.add.reduceat(dx * dy, starts)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = ss_xy / ss_xx
+            intercept = y_mean - slope * x_mean
+            denom = ss_xx * ss_yy
+            r2 = np.where(denom > 0, ss_xy**2 / denom, 0.0)
+    
+    return {(elem[s], sn[s]): (slope[g], intercept[g], r2[g])
+            for g, s in enumerate(starts) if n[g] >= 3}
+
+
 def plot_arrhenius(df, output_dir):
     """
     绘制Arrhenius图: ln(D) vs 1000/T
@@ -225,73 +374,79 @@ def plot_arrhenius(df, output_dir):
         print("  [!] No high-temperature data available")
         return None
     
-    fig, axes = plt.subplots(1, 3, figsize=(20, 6))
+    fig, axes = plt.subplots(1, 3, figsize=(20, 6), constrained_layout=True)
     
-    # 定义颜色映射
-    cmap = plt.cm.viridis
     sn_contents = sorted(df_high_temp['sn_content'].unique())
-    colors_sn = {sn: cmap(i/len(sn_contents)) for i, sn in enumerate(sn_contents)}
+    
+    # 一次性完成所有 (元素, Sn含量) 组的线性拟合
+    fits = fit_arrhenius_groups(df_high_temp)
+    
+    # 一次分组 (df已按温度排序), 子图内只需字典查找
+    by_elem_sn = dict(tuple(df_high_temp.groupby(['element', 'sn_content'], observed=True)))
+    elements_with_data = {element for element, _ in by_elem_sn}
     
     # 存储活化能结果
     activation_energies = []
     
     for idx, element in enumerate(['Pt', 'Sn', 'PtSn']):
         ax = axes[idx]
-        df_elem = df_high_temp[df_high_temp['element'] == element]
         
-        if len(df_elem) == 0:
+        if element not in elements_with_data:
             ax.text(0.5, 0.5, 'No Data', ha='center', va='center',
                    transform=ax.transAxes, fontsize=14)
             ax.set_title(f'{element}', fontsize=12, fontweight='bold')
             continue
         
-        # 按Sn含量分组
-        for sn in sn_contents:
-            df_sn = df_elem[df_elem['sn_content'] == sn]
-            df_sn = df_sn.sort_values('temp_K')
+        # 按Sn含量分组 (至少需要3个点才能拟合)
+        sn_fitted = [sn for sn in sn_contents if (element, sn) in fits]
+        point_segments = []
+        fit_segments = []
+        
+        for sn in sn_fitted:
+            df_sn = by_elem_sn[(element, sn)]
+            x = df_sn['inv_T_1000K'].to_numpy(dtype=float)
+            point_segments.append(np.column_stack([x, df_sn['ln_D'].to_numpy(dtype=float)]))
             
-            if len(df_sn) < 3:  # 至少需要3个点才能拟合
-                continue
+            # 线性拟合 (Arrhenius方程: ln(D) = ln(D0) - Ea/(R*T))
+            slope, intercept, r2 = fits[(element, sn)]
             
-            # 绘制数据点
-            ax.plot(df_sn['inv_T_1000K'], df_sn['ln_D'],
-                   'o', label=f'Sn{int(sn)}', 
-                   color=colors_sn[sn],
-                   markersize=8, alpha=0.7)
+            # 拟合线端点
+            x_fit = np.array([x.min(), x.max()])
+            y_fit = slope * x_fit + intercept
+            fit_segments.append(np.column_stack([x_fit, y_fit]))
             
-            # 线性拟合 (Arrhenius方程: ln(D) = ln(D0) - Ea/(R*T))
-            try:
-                slope, intercept, r_value, p_value, std_err = stats.linregress(
-                    df_sn['inv_T_1000K'], df_sn['ln_D']
-                )
-                
-                # 绘制拟合线
-                x_fit = np.array([df_sn['inv_T_1000K'].min(), 
-                                 df_sn['inv_T_1000K'].max()])
-                y_fit = slope * x_fit + intercept
-                ax.plot(x_fit, y_fit, '--', color=colors_sn[sn], 
-                       linewidth=1.5, alpha=0.5)
-                
-                # 计算活化能 (Ea = -slope * R * 1000)
-                # R = 8.314 J/(mol·K)
-                Ea_kJ_mol = -slope * 8.314  # kJ/mol
-                
-                activation_energies.append({
-                    'element': element,
-                    'sn_content': int(sn),
-                    'Ea_kJ_mol': Ea_kJ_mol,
-                    'r2': r_value**2,
-                    'n_points': len(df_sn),
-                    'T_range': f"{df_sn['temp_K'].min()}-{df_sn['temp_K'].max()}K"
-                })
-                
-            except Exception as e:
-                continue
+            # 计算活化能 (Ea = -slope * R * 1000)
+            # R = 8.314 J/(mol·K)
+            Ea_kJ_mol = -slope * 8.314  # kJ/mol
+            
+            activation_energies.append({
+                'element': element,
+                'sn_content': int(sn),
+                'Ea_kJ_mol': Ea_kJ_mol,
+                'r2': r2,
+                'n_points': len(df_sn),
+                'T_range': f"{df_sn['temp_K'].min()}-{df_sn['temp_K'].max()}K"
+            })
+        
+        # 数据点合并为一个 scatter, 拟合线合并为一个 LineCollection
+        sn_colors = SN_COLOR_LUT.take(sn_fitted, axis=0, mode='clip')
+        if sn_fitted:
+            points = np.concatenate(point_segments)
+            point_colors = np.repeat(sn_colors, [len(seg) for seg in point_segments], axis=0)
+            ax.scatter(points[:, 0], points[:, 1], c=point_colors, s=8**2, alpha=0.7)
+            ax.add_collection(LineCollection(fit_segments, colors=sn_colors, linewidths=1.5,
+                                             linestyles='--', alpha=0.5))
+            ax.autoscale_view()
+        
+        # 图例使用代理句柄
+        handles = [Line2D([], [], marker='o', linestyle='None', color=color,
+                          markersize=8, alpha=0.7, label=f'Sn{int(sn)}')
+                   for sn, color in zip(sn_fitted, sn_colors)]
         
         ax.set_xlabel('1000/T (K⁻¹)', fontsize=11, fontweight='bold')
         ax.set_ylabel('ln(D) [D in cm²/s]', fontsize=11, fontweight='bold')
         ax.set_title(f'{element}', fontsize=12, fontweight='bold', color=COLORS[element])
-        ax.legend(fontsize=8, ncol=2, loc='best')
+        ax.legend(handles=handles, fontsize=8, ncol=2, loc='best')
         ax.grid(True, alpha=0.3)
         ax.invert_xaxis()  # 高温在右
     
@@ -299,10 +454,9 @@ def plot_arrhenius(df, output_dir):
                 'High Temperature Region (≥700K) | Dashed lines: Linear fits',
                 fontsize=14, fontweight='bold')
     
-    plt.tight_layout()
-    
     output_file = output_dir / 'Arrhenius_plot_SnContent_comparison.png'
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=GRID_DPI, bbox_inches='tight',
+                pil_kwargs=PNG_PIL_KWARGS)
     plt.close(fig)
     
     print(f"  [OK] Saved: {output_file.name}")
@@ -320,7 +474,7 @@ def plot_activation_energy(activation_energies, output_dir):
     
     df_ea = pd.DataFrame(activation_energies)
     
-    fig, ax = plt.subplots(1, 1, figsize=(10, 6))
+    fig, ax = plt.subplots(1, 1, figsize=(10, 6), constrained_layout=True)
     
     for element in ['Pt', 'Sn', 'PtSn']:
         df_elem = df_ea[df_ea['element'] == element]
@@ -328,8 +482,6 @@ def plot_activation_energy(activation_energies, output_dir):
         if len(df_elem) == 0:
             continue
         
-        df_elem = df_elem.sort_values('sn_content')
-        
         ax.plot(df_elem['sn_content'], df_elem['Ea_kJ_mol'],
                'o-', label=element, color=COLORS[element],
                markersize=10, linewidth=2.5, alpha=0.7)
@@ -352,10 +504,9 @@ def plot_activation_energy(activation_energies, output_dir):
     ax.set_xlim(-0.5, 10.5)
     ax.set_xticks(range(0, 11))
     
-    plt.tight_layout()
-    
     output_file = output_dir / 'ActivationEnergy_vs_SnContent.png'
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=SUMMARY_DPI, bbox_inches='tight',
+                pil_kwargs=PNG_PIL_KWARGS)
     plt.close(fig)
     
     print(f"  [OK] Saved: {output_file.name}")
@@ -369,107 +520,106 @@ def generate_statistics_table(df, activation_energies, output_dir):
     
     report_file = output_dir / 'SnContent_effect_report.txt'
     
-    with open(report_file, 'w', encoding='utf-8') as f:
-        f.write("="*80 + "\n")
-        f.write("Sn Content Effect on Diffusion Behavior - Statistical Analysis\n")
-        f.write("="*80 + "\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"System: Pt8SnX (X = 0-10)\n")
-        f.write("="*80 + "\n\n")
-        
-        # 1. 按Sn含量统计平均D值
-        f.write("1. Average Diffusion Coefficient by Sn Content\n")
-        f.write("-"*80 + "\n")
-        f.write(f"{'Sn':<5} {'Element':<8} {'<D> (cm²/s)':<15} {'Std':<15} {'N':<5} {'T_range':<15}\n")
-        f.write("-"*80 + "\n")
-        
-        for sn in sorted(df['sn_content'].unique()):
-            for element in ['Pt', 'Sn', 'PtSn']:
-                df_subset = df[(df['sn_content'] == sn) & 
-                              (df['element'] == element) & 
-                              (df['D_cm2_s'] > 0)]
-                
-                if len(df_subset) == 0:
-                    continue
-                
-                mean_D = df_subset['D_cm2_s'].mean()
-                std_D = df_subset['D_cm2_s'].std()
-                n = len(df_subset)
-                T_range = f"{df_subset['temp_K'].min():.0f}-{df_subset['temp_K'].max():.0f}K"
-                
-                f.write(f"{int(sn):<5} {element:<8} {mean_D:>14.2e} {std_D:>14.2e} {n:<5} {T_range:<15}\n")
+    parts = []
+    parts.append("="*80 + "\n")
+    parts.append("Sn Content Effect on Diffusion Behavior - Statistical Analysis\n")
+    parts.append("="*80 + "\n")
+    parts.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    parts.append(f"System: Pt8SnX (X = 0-10)\n")
+    parts.append("="*80 + "\n\n")
+    
+    # 1. 按Sn含量统计平均D值
+    parts.append("1. Average Diffusion Coefficient by Sn Content\n")
+    parts.append("-"*80 + "\n")
+    parts.append(f"{'Sn':<5} {'Element':<8} {'<D> (cm²/s)':<15} {'Std':<15} {'N':<5} {'T_range':<15}\n")
+    parts.append("-"*80 + "\n")
+    
+    # 一次分组聚合所有 (Sn含量, 元素) 组合, 元素按分类顺序 Pt, Sn, PtSn 输出
+    df_pos = df[df['D_cm2_s'] > 0]
+    agg = df_pos.groupby(['sn_content', 'element'], observed=True).agg(
+        mean_D=('D_cm2_s', 'mean'),
+        std_D=('D_cm2_s', 'std'),
+        n=('D_cm2_s', 'count'),
+        tmin=('temp_K', 'min'),
+        tmax=('temp_K', 'max'),
+    )
+    
+    for (sn, element), row in zip(agg.index, agg.itertuples(index=False)):
+        T_range = f"{row.tmin:.0f}-{row.tmax:.0f}K"
+        parts.append(f"{int(sn):<5} {element:<8} {row.mean_D:>14.2e} {row.std_D:>14.2e} {row.n:<5} {T_range:<15}\n")
+    
+    parts.append("\n" + "="*80 + "\n\n")
+    
+    # 2. 按温度统计 (选择代表性温度)
+    parts.append("2. D Value Comparison at Selected Temperatures\n")
+    parts.append("-"*80 + "\n")
+    
+    report_temps = [700, 800, 900, 1000, 1100]
+    
+    # 一次透视得到每个 (温度, Sn含量) 下各元素的D值 (取首条记录)
+    df_sel = df[df['temp_K'].isin(report_temps) & (df['D_cm2_s'] > 0)]
+    pivot = df_sel.pivot_table(index=['temp_K', 'sn_content'], columns='element',
+                               values='D_cm2_s', aggfunc='first', observed=True)
+    pivot = pivot.reindex(columns=ELEMENTS)
+    
+    for temp in report_temps:
+        parts.append(f"\nTemperature: {temp}K\n")
+        parts.append(f"{'Sn':<5} {'Pt (cm²/s)':<15} {'Sn (cm²/s)':<15} {'PtSn (cm²/s)':<15}\n")
+        parts.append("-"*80 + "\n")
         
-        f.write("\n" + "="*80 + "\n\n")
-        
-        # 2. 按温度统计 (选择代表性温度)
-        f.write("2. D Value Comparison at Selected Temperatures\n")
-        f.write("-"*80 + "\n")
-        
-        for temp in [700, 800, 900, 1000, 1100]:
-            f.write(f"\nTemperature: {temp}K\n")
-            f.write(f"{'Sn':<5} {'Pt (cm²/s)':<15} {'Sn (cm²/s)':<15} {'PtSn (cm²/s)':<15}\n")
-            f.write("-"*80 + "\n")
-            
-            df_temp = df[(df['temp_K'] == temp) & (df['D_cm2_s'] > 0)]
-            
-            for sn in sorted(df_temp['sn_content'].unique()):
-                df_sn = df_temp[df_temp['sn_content'] == sn]
-                
-                D_pt = df_sn[df_sn['element'] == 'Pt']['D_cm2_s'].values
-                D_sn = df_sn[df_sn['element'] == 'Sn']['D_cm2_s'].values
-                D_ptsn = df_sn[df_sn['element'] == 'PtSn']['D_cm2_s'].values
-                
-                D_pt_str = f"{D_pt[0]:.2e}" if len(D_pt) > 0 else "N/A"
-                D_sn_str = f"{D_sn[0]:.2e}" if len(D_sn) > 0 else "N/A"
-                D_ptsn_str = f"{D_ptsn[0]:.2e}" if len(D_ptsn) > 0 else "N/A"
-                
-                f.write(f"{int(sn):<5} {D_pt_str:<15} {D_sn_str:<15} {D_ptsn_str:<15}\n")
-        
-        f.write("\n" + "="*80 + "\n\n")
+        if temp not in pivot.index:
+            continue
         
-        # 3. 活化能统计
-        if activation_energies:
-            f.write("3. Activation Energy (High Temperature: T≥700K)\n")
-            f.write("-"*80 + "\n")
-            f.write(f"{'Sn':<5} {'Element':<8} {'Ea (kJ/mol)':<15} {'R²':<8} {'N':<5} {'T_range':<15}\n")
-            f.write("-"*80 + "\n")
-            
-            for ea in activation_energies:
-                f.write(f"{ea['sn_content']:<5} {ea['element']:<8} "
-                       f"{ea['Ea_kJ_mol']:>14.2f} {ea['r2']:>7.3f} "
-                       f"{ea['n_points']:<5} {ea['T_range']:<15}\n")
+        for sn, values in pivot.loc[temp].iterrows():
+            D_pt_str, D_sn_str, D_ptsn_str = (
+                f"{v:.2e}" if pd.notna(v) else "N/A" for v in values
+            )
             
-            f.write("\n" + "="*80 + "\n\n")
-        
-        # 4. 关键发现
-        f.write("4. Key Findings\n")
-        f.write("-"*80 + "\n")
+            parts.append(f"{int(sn):<5} {D_pt_str:<15} {D_sn_str:<15} {D_ptsn_str:<15}\n")
+    
+    parts.append("\n" + "="*80 + "\n\n")
+    
+    # 3. 活化能统计
+    if activation_energies:
+        parts.append("3. Activation Energy (High Temperature: T≥700K)\n")
+        parts.append("-"*80 + "\n")
+        parts.append(f"{'Sn':<5} {'Element':<8} {'Ea (kJ/mol)':<15} {'R²':<8} {'N':<5} {'T_range':<15}\n")
+        parts.append("-"*80 + "\n")
         
-        # 找出D值最大和最小的Sn含量
-        df_high_temp = df[(df['temp_K'] >= 800) & (df['D_cm2_s'] > 0)]
+        for ea in activation_energies:
+            parts.append(f"{ea['sn_content']:<5} {ea['element']:<8} "
+                         f"{ea['Ea_kJ_mol']:>14.2f} {ea['r2']:>7.3f} "
+                         f"{ea['n_points']:<5} {ea['T_range']:<15}\n")
         
-        for element in ['Pt', 'Sn', 'PtSn']:
-            df_elem = df_high_temp[df_high_temp['element'] == element]
-            
-            if len(df_elem) == 0:
-                continue
-            
-            # 按Sn含量分组计算平均D
-            D_by_sn = df_elem.groupby('sn_content')['D_cm2_s'].mean()
-            
-            if len(D_by_sn) > 0:
-                max_sn = D_by_sn.idxmax()
-                min_sn = D_by_sn.idxmin()
-                
-                f.write(f"\n{element}:\n")
-                f.write(f"  Highest D at high T (≥800K): Sn{int(max_sn)} "
-                       f"(D_avg = {D_by_sn[max_sn]:.2e} cm²/s)\n")
-                f.write(f"  Lowest D at high T (≥800K):  Sn{int(min_sn)} "
-                       f"(D_avg = {D_by_sn[min_sn]:.2e} cm²/s)\n")
+        parts.append("\n" + "="*80 + "\n\n")
+    
+    # 4. 关键发现
+    parts.append("4. Key Findings\n")
+    parts.append("-"*80 + "\n")
+    
+    # 找出D值最大和最小的Sn含量: 一次分组计算各 (元素, Sn含量) 的平均D
+    df_high_temp = df[(df['temp_K'] >= 800) & (df['D_cm2_s'] > 0)]
+    D_mean = df_high_temp.groupby(['element', 'sn_content'], observed=True)['D_cm2_s'].mean()
+    D_by_elem = D_mean.groupby(level='element', observed=True)
+    max_keys = D_by_elem.idxmax()
+    min_keys = D_by_elem.idxmin()
+    
+    for element in max_keys.index:
+        max_key = max_keys[element]
+        min_key = min_keys[element]
         
-        f.write("\n" + "="*80 + "\n")
-        f.write("End of Report\n")
-        f.write("="*80 + "\n")
+        parts.append(f"\n{element}:\n")
+        parts.append(f"  Highest D at high T (≥800K): Sn{int(max_key[1])} "
+                     f"(D_avg = {D_mean[max_key]:.2e} cm²/s)\n")
+        parts.append(f"  Lowest D at high T (≥800K):  Sn{int(min_key[1])} "
+                     f"(D_avg = {D_mean[min_key]:.2e} cm²/s)\n")
+    
+    parts.append("\n" + "="*80 + "\n")
+    parts.append("End of Report\n")
+    parts.append("="*80 + "\n")
+    
+    with open(report_file, 'w', encoding='utf-8') as f:
+        f.write(''.join(parts))
     
     print(f"  [OK] Saved: {report_file.name}")
 
@@ -491,16 +641,20 @@ def main():
     
     # 2.1 D vs Sn含量 (不同温度)
     plot_D_vs_sn_content(df, OUTPUT_DIR)
+    plt.close('all')
     
     # 2.2 D vs 温度 (不同Sn含量)
     plot_D_vs_temperature_comparison(df, OUTPUT_DIR)
+    plt.close('all')
     
     # 2.3 Arrhenius图
     activation_energies = plot_arrhenius(df, OUTPUT_DIR)
+    plt.close('all')
     
     # 2.4 活化能 vs Sn含量
     if activation_energies:
         df_ea = plot_activation_energy(activation_energies, OUTPUT_DIR)
+        plt.close('all')
         
         # 保存活化能数据
         ea_file = OUTPUT_DIR / 'activation_energies.csv'
@@ -14,12 +14,33 @@ Step 6.1.1.3: Air68 vs Air86 分区热容组合图
 
 import os
 import sys
+import math
+from collections import defaultdict
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # 只输出PNG, 使用无界面后端
 import matplotlib.pyplot as plt
-from scipy.stats import linregress
+from matplotlib.collections import LineCollection
 from pathlib import Path
 
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# 组合图的图形对象缓存: 批量调用 plot_combined_cv 时复用同一个图形, 只清空坐标轴
+_FIG = None
+_AXES = None
+
+# 可选: numba JIT 编译热容曲线计算 (批量运行多组结构时使用)
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
 # 设置高质量论文图样式（与原图一致）
 plt.rcParams['font.sans-serif'] = ['Arial', 'DejaVu Sans', 'SimHei']
 plt.rcParams['axes.unicode_minus'] = False
@@ -32,92 +53,195 @@ plt.rcParams['ytick.major.width'] = 1.2
 def load_cluster_data(csv_path):
     """加载聚类结果数据"""
     try:
-        df = pd.read_csv(csv_path)
+        # 只读取用到的三列并指定类型 (相标签只有少数几种取值, 直接读为分类类型)
+        df = pd.read_csv(
+            csv_path,
+            usecols=['temp', 'avg_energy', 'phase_clustered'],
+            dtype={'temp': 'float64', 'avg_energy': 'float64', 'phase_clustered': 'category'},
+            engine='pyarrow' if HAS_PYARROW else 'c',
+        )
         return df
     except Exception as e:
         print(f"  错误: 无法读取 {csv_path}: {e}")
         return None
 
 
+def plot_energy_points(ax, temps, E_rel, E_std):
+    """
+    绘制带误差棒的能量数据点
+    
+    外观与 ax.errorbar(fmt='o', markersize=7, capsize=3) 相同, 但误差棒合并为
+    一个 LineCollection, 端帽合并为一条 '_' 标记线, 数据点为一个 scatter,
+    避免 errorbar 为每个点生成独立的艺术家对象。
+    误差棒与数据点集合设为栅格化, 导出 PDF/SVG 时坐标轴与文字仍为矢量。
+    """
+    E_low = E_rel - E_std
+    E_high = E_rel + E_std
+    
+    # 竖直误差棒: 每个温度一段 (T, E-σ) -> (T, E+σ)
+    segments = np.stack([np.column_stack([temps, E_low]),
+                         np.column_stack([temps, E_high])], axis=1)
+    ax.add_collection(LineCollection(segments, colors='gray', linewidths=1.5, zorder=5,
+                                     rasterized=True))
+    
+    # 误差棒端帽 (marker 尺寸单位为点, 与 capsize=3 一致)
+    ax.plot(np.concatenate([temps, temps]), np.concatenate([E_low, E_high]),
+            linestyle='none', marker='_', markersize=6, markeredgewidth=1.5,
+            color='gray', zorder=5)
+    
+    # 数据点
+    ax.scatter(temps, E_rel, s=7**2, color='black', zorder=5, rasterized=True)
+    ax.autoscale_view()
+
+
+def _linfit(x, y):
+    """
+    一元线性最小二乘拟合 (闭式解)
+    
+    与 scipy.stats.linregress 的 slope/intercept/R²/stderr 定义一致,
+    对几十个点的小数组省去 scipy 的参数检查与额外统计量开销。
+    
+    返回: (slope, intercept, r2, std_err)
+    """
+    n = len(x)
+    xm = x.mean()
+    ym = y.mean()
+    dx = x - xm
+    dy = y - ym
+    sxx = (dx * dx).sum()
+    sxy = (dx * dy).sum()
+    syy = (dy * dy).sum()
+    
+    slope = sxy / sxx
+    intercept = ym - slope * xm
+    # 与 linregress 相同: y 为常数时 r=0; 完全线性时残差平方和可能舍入为微小负数, 截断为 0
+    r2 = (sxy * sxy) / (sxx * syy) if syy > 0 else 0.0
+    std_err = np.sqrt(max(syy - slope * sxy, 0.0) / (n - 2) / sxx) if n > 2 else 0.0
+    return slope, intercept, r2, std_err
+
+
+def _cv_curve_kernel(T_plot, T_boundary, sigma, Cv1, Cv2, Cv_trans, out):
+    """逐点计算 S形基线 + 高斯峰 (供 numba 编译的单次循环版本)"""
+    inv_s = 1.0 / (sigma * 0.5)
+    inv_sig = 1.0 / sigma
+    for i in range(T_plot.size):
+        t = T_plot[i]
+        tr = 1.0 / (1.0 + math.exp(-(t - T_boundary) * inv_s))
+        base = Cv1 + (Cv2 - Cv1) * tr
+        z = (t - T_boundary) * inv_sig
+        out[i] = base + (Cv_trans - base) * math.exp(-0.5 * z * z)
+
+
+if HAS_NUMBA:
+    _cv_curve_kernel = njit(cache=True)(_cv_curve_kernel)
+
+
+def cv_curve(T_plot, T_boundary, sigma, Cv1, Cv2, Cv_trans):
+    """
+    带峰的热容曲线: 在 T_boundary 处由 Cv1 S形过渡到 Cv2, 叠加峰值为 Cv_trans 的高斯峰
+    
+    安装numba时使用编译后的 _cv_curve_kernel, 否则对整个温度数组做 numpy 向量化计算。
+    """
+    if HAS_NUMBA:
+        out = np.empty_like(T_plot)
+        _cv_curve_kernel(T_plot, T_boundary, sigma, Cv1, Cv2, Cv_trans, out)
+        return out
+    
+    transition = 1 / (1 + np.exp(-(T_plot - T_boundary) / (sigma * 0.5)))
+    baseline = Cv1 + (Cv2 - Cv1) * transition
+    gaussian = (Cv_trans - baseline) * np.exp(-0.5 * ((T_plot - T_boundary) / sigma)**2)
+    return baseline + gaussian
+
+
 def compute_partition_data(df, structure_name):
     """计算分区热容数据"""
     
-    # 按温度分组计算能量
-    temp_groups = df.groupby('temp')
-    temps_unique = []
-    E_mean = []
-    E_std = []
+    # 按温度分组计算能量 (一次聚合; 标准差与 np.std 一致取 ddof=0)
+    energy_by_temp = df.groupby('temp', sort=True)['avg_energy']
+    agg = pd.DataFrame({
+        'mean': energy_by_temp.mean(),
+        'std': energy_by_temp.std(ddof=0),
+    })
     
-    for temp, group in temp_groups:
-        E_cluster = group['avg_energy'].values
-        temps_unique.append(temp)
-        E_mean.append(np.mean(E_cluster))
-        E_std.append(np.std(E_cluster))
+    temps_unique = agg.index.to_numpy()
+    E_mean = agg['mean'].to_numpy()
+    E_std = agg['std'].to_numpy()
     
-    temps_unique = np.array(temps_unique)
-    E_mean = np.array(E_mean)
-    E_std = np.array(E_std)
+    # 温度 -> 数组下标, 按温度取值时用哈希查找代替 np.where 扫描
+    temp_index = {t: i for i, t in enumerate(temps_unique)}
     
     # 相对能量
     E_ref = E_mean.min()
     E_rel = E_mean - E_ref
     
     # 多数投票确定每个温度的相态
-    temp_to_partition = {}
-    for temp in temps_unique:
-        df_temp = df[df['temp'] == temp]
-        partition_counts = df_temp['phase_clustered'].value_counts()
-        temp_to_partition[temp] = partition_counts.idxmax()
+    # (一次分组计数; sort=False 保留首次出现顺序, 平票时与 value_counts().idxmax() 结果一致)
+    counts = df.groupby(['temp', 'phase_clustered'], sort=False, observed=True).size()
+    winners = counts.groupby(level='temp').idxmax()
+    temp_to_partition = pd.Series([phase for _, phase in winners.loc[temps_unique]],
+                                  index=agg.index, name='phase')
     
-    # 分区拟合
-    phases = sorted(df['phase_clustered'].unique())
-    phase_fits = {}
+    # 分区拟合 (分类类型的 categories 已排序)
+    phases = df['phase_clustered'].cat.categories.tolist()
+    fit_rows = {}
+    
+    # 一次遍历建立 相态 -> 温度下标 映射 (temps_unique 已升序, 各列表也为升序)
+    phase_to_idx = defaultdict(list)
+    for i, phase in enumerate(temp_to_partition.to_numpy()):
+        phase_to_idx[phase].append(i)
     
     for phase in phases:
-        phase_temps = [t for t, p in temp_to_partition.items() if p == phase]
-        phase_temps = sorted(phase_temps)
+        idx = phase_to_idx.get(phase, [])
         
-        if len(phase_temps) >= 2:
-            mask = np.isin(temps_unique, phase_temps)
-            T_phase = temps_unique[mask]
-            E_phase = E_rel[mask]
-            E_phase_std = E_std[mask]
+        if len(idx) >= 2:
+            T_phase = temps_unique[idx]
+            E_phase = E_rel[idx]
             
-            slope, intercept, r_value, _, std_err = linregress(T_phase, E_phase)
+            slope, intercept, r2, std_err = _linfit(T_phase, E_phase)
             
-            phase_fits[phase] = {
-                'slope': slope,
-                'intercept': intercept,
-                'Cv': slope * 1000,  # meV/K
-                'Cv_err': std_err * 1000,
-                'R2': r_value ** 2,
-                'T_range': (T_phase.min(), T_phase.max()),
-                'T_data': T_phase,
-                'E_data': E_phase,
-                'E_std': E_phase_std
-            }
+            # Cv 单位 meV/K
+            fit_rows[phase] = (slope, intercept, slope * 1000, std_err * 1000, r2,
+                               T_phase[0], T_phase[-1])
+    
+    # 各相拟合参数表 (行: 相态)
+    phase_fits = pd.DataFrame.from_dict(
+        fit_rows, orient='index',
+        columns=['slope', 'intercept', 'Cv', 'Cv_err', 'R2', 'T_min', 'T_max'])
     
     # 分界温度
     T_boundary = None
     if len(phases) >= 2:
-        phase1_temps = [t for t, p in temp_to_partition.items() if p == phases[0]]
-        phase2_temps = [t for t, p in temp_to_partition.items() if p == phases[1]]
-        if phase1_temps and phase2_temps:
-            T1_last = max(phase1_temps)
-            T2_first = min(phase2_temps)
+        phase1_idx = phase_to_idx.get(phases[0])
+        phase2_idx = phase_to_idx.get(phases[1])
+        if phase1_idx and phase2_idx:
+            T1_last = temps_unique[phase1_idx[-1]]
+            T2_first = temps_unique[phase2_idx[0]]
             T_boundary = (T1_last + T2_first) / 2
     
     return {
         'temps': temps_unique,
+        'temp_index': temp_index,
         'E_rel': E_rel,
         'E_std': E_std,
         'temp_to_partition': temp_to_partition,
-        'phase_fits': phase_fits,
+        'phase_fits_df': phase_fits,
         'T_boundary': T_boundary,
         'phases': phases
     }
 
 
+def load_and_compute(csv_path, structure_name):
+    """
+    读取单个体系的聚类数据并计算分区热容
+    
+    返回: (记录数, compute_partition_data 结果); 读取失败时返回 None
+    """
+    df = load_cluster_data(csv_path)
+    if df is None:
+        return None
+    return len(df), compute_partition_data(df, structure_name)
+
+
 def plot_combined_cv(data_68, data_86, output_dir):
     """绘制组合图"""
     
@@ -125,103 +249,76 @@ def plot_combined_cv(data_68, data_86, output_dir):
     output_dir.mkdir(parents=True, exist_ok=True)
     
     # 创建图表 - 三列，保持原图高宽比 (8:6)
-    fig, (ax1_left, ax1_mid, ax1_right) = plt.subplots(1, 3, figsize=(24, 6))
-    
-    # ========== 统一Y轴范围 ==========
-    # 能量Y轴
-    all_E = np.concatenate([data_68['E_rel'], data_86['E_rel']])
-    all_E_std = np.concatenate([data_68['E_std'], data_86['E_std']])
-    E_min = (all_E - all_E_std).min()
-    E_max = (all_E + all_E_std).max()
-    E_margin = (E_max - E_min) * 0.1
-    E_ylim = (E_min - E_margin, E_max + E_margin)
-    
-    # 热容Y轴
-    all_Cv = []
-    for data in [data_68, data_86]:
-        for fit in data['phase_fits'].values():
-            all_Cv.append(fit['Cv'])
-        # 检查是否有峰
-        if len(data['phases']) >= 2:
-            phases = sorted(data['phases'])
-            fit1 = data['phase_fits'].get(phases[0])
-            fit2 = data['phase_fits'].get(phases[1])
-            if fit1 and fit2:
-                T1_last = fit1['T_range'][1]
-                T2_first = fit2['T_range'][0]
-                idx1 = np.where(data['temps'] == T1_last)[0]
-                idx2 = np.where(data['temps'] == T2_first)[0]
-                if len(idx1) > 0 and len(idx2) > 0:
-                    E1 = data['E_rel'][idx1[0]]
-                    E2 = data['E_rel'][idx2[0]]
-                    Cv_trans = (E2 - E1) / (T2_first - T1_last) * 1000
-                    all_Cv.append(Cv_trans)
-    
-    Cv_min = min(all_Cv) * 0.85
-    Cv_max = max(all_Cv) * 1.1
-    Cv_ylim = (Cv_min, Cv_max)
+    # 三个能量轴共享Y轴, 热容轴之间也共享Y轴, 统一范围由matplotlib在绘制时完成
+    global _FIG, _AXES
+    if _FIG is None:
+        _FIG, _AXES = plt.subplots(1, 3, figsize=(24, 6), sharey=True, constrained_layout=True)
+    else:
+        # 移除上次创建的 twinx 热容轴, 再清空三个能量轴
+        for ax in _FIG.axes[len(_AXES):]:
+            ax.remove()
+        for ax in _AXES:
+            ax.cla()
+    fig = _FIG
+    ax1_left, ax1_mid, ax1_right = _AXES
     
     # ========== 绘制函数 ==========
-    def plot_single(ax1, data, title):
-        """绘制单个分区热容图"""
+    def plot_single(ax1, data, title, ax2_share=None):
+        """绘制单个分区热容图 (ax2_share: 与之共享Y轴的热容轴)"""
         temps = data['temps']
+        temp_index = data['temp_index']
         E_rel = data['E_rel']
         E_std = data['E_std']
-        phase_fits = data['phase_fits']
+        phase_fits = data['phase_fits_df']
         phases = sorted(data['phases'])
         T_boundary = data['T_boundary']
         
         # 左Y轴: 能量数据点
-        ax1.errorbar(temps, E_rel, yerr=E_std,
-                     fmt='o', markersize=7, color='black',
-                     ecolor='gray', elinewidth=1.5, capsize=3, capthick=1.5,
-                     zorder=5)
+        plot_energy_points(ax1, temps, E_rel, E_std)
         
         # 拟合线
         for phase in phases:
-            if phase in phase_fits:
-                fit = phase_fits[phase]
-                T_fit = np.linspace(fit['T_range'][0], fit['T_range'][1], 50)
+            if phase in phase_fits.index:
+                fit = phase_fits.loc[phase]
+                T_fit = np.array([fit['T_min'], fit['T_max']])  # 直线只需两个端点
                 E_fit = fit['slope'] * T_fit + fit['intercept']
                 ax1.plot(T_fit, E_fit, '-', color='black', linewidth=2, zorder=4)
         
         # 连接分区
-        if len(phases) >= 2 and phases[0] in phase_fits and phases[1] in phase_fits:
-            fit1 = phase_fits[phases[0]]
-            fit2 = phase_fits[phases[1]]
-            T1_end = fit1['T_range'][1]
-            T2_start = fit2['T_range'][0]
-            idx1 = np.where(temps == T1_end)[0]
-            idx2 = np.where(temps == T2_start)[0]
-            if len(idx1) > 0 and len(idx2) > 0:
-                E1 = E_rel[idx1[0]]
-                E2 = E_rel[idx2[0]]
+        if len(phases) >= 2 and phases[0] in phase_fits.index and phases[1] in phase_fits.index:
+            T1_end = phase_fits.at[phases[0], 'T_max']
+            T2_start = phase_fits.at[phases[1], 'T_min']
+            i1 = temp_index.get(T1_end)
+            i2 = temp_index.get(T2_start)
+            if i1 is not None and i2 is not None:
+                E1 = E_rel[i1]
+                E2 = E_rel[i2]
                 ax1.plot([T1_end, T2_start], [E1, E2], '-', color='black', linewidth=2, zorder=4)
         
         ax1.set_xlabel('Temperature (K)', fontsize=13, fontweight='bold')
         ax1.set_ylabel('Total Energy (eV)', fontsize=13, fontweight='bold')
-        ax1.set_ylim(E_ylim)
-        ax1.tick_params(axis='both', labelsize=11)
+        ax1.margins(y=0.1)
+        ax1.tick_params(axis='both', labelsize=11, labelleft=True)
         ax1.set_title(title, fontsize=14, fontweight='bold', pad=10)
         
         # 右Y轴: 热容
         ax2 = ax1.twinx()
+        if ax2_share is not None:
+            ax2.sharey(ax2_share)
         
-        if len(phases) >= 2 and phases[0] in phase_fits and phases[1] in phase_fits:
-            Cv1 = phase_fits[phases[0]]['Cv']
-            Cv2 = phase_fits[phases[1]]['Cv']
+        if len(phases) >= 2 and phases[0] in phase_fits.index and phases[1] in phase_fits.index:
+            Cv1 = phase_fits.at[phases[0], 'Cv']
+            Cv2 = phase_fits.at[phases[1], 'Cv']
             
             # 计算过渡区热容
-            fit1 = phase_fits[phases[0]]
-            fit2 = phase_fits[phases[1]]
-            T1_last = fit1['T_range'][1]
-            T2_first = fit2['T_range'][0]
-            idx1 = np.where(temps == T1_last)[0]
-            idx2 = np.where(temps == T2_first)[0]
+            T1_last = phase_fits.at[phases[0], 'T_max']
+            T2_first = phase_fits.at[phases[1], 'T_min']
+            i1 = temp_index.get(T1_last)
+            i2 = temp_index.get(T2_first)
             
-            if len(idx1) > 0 and len(idx2) > 0:
-                E1 = E_rel[idx1[0]]
-                E2 = E_rel[idx2[0]]
+            if i1 is not None and i2 is not None:
+                E1 = E_rel[i1]
+                E2 = E_rel[i2]
                 Cv_transition = (E2 - E1) / (T2_first - T1_last) * 1000
             else:
                 Cv_transition = (Cv1 + Cv2) / 2
@@ -232,13 +329,9 @@ def plot_combined_cv(data_68, data_86, output_dir):
                 # 带峰的热容曲线
                 T_plot = np.linspace(temps.min(), temps.max(), 500)
                 sigma = (T2_first - T1_last) / 2
-                Cv_plot = np.zeros_like(T_plot)
                 
-                for i, T in enumerate(T_plot):
-                    transition = 1 / (1 + np.exp(-(T - T_boundary) / (sigma * 0.5)))
-                    baseline = Cv1 + (Cv2 - Cv1) * transition
-                    gaussian = (Cv_transition - baseline) * np.exp(-0.5 * ((T - T_boundary) / sigma)**2)
-                    Cv_plot[i] = baseline + gaussian
+                # S形基线 + 高斯峰
+                Cv_plot = cv_curve(T_plot, T_boundary, sigma, Cv1, Cv2, Cv_transition)
                 
                 ax2.plot(T_plot, Cv_plot, 'r-', linewidth=2, zorder=3)
             else:
@@ -247,75 +340,73 @@ def plot_combined_cv(data_68, data_86, output_dir):
                 ax2.plot([T_boundary, T_boundary], [Cv1, Cv2], 'r--', linewidth=1.5, zorder=3)
                 ax2.plot([T_boundary, temps.max()], [Cv2, Cv2], 'r-', linewidth=2, zorder=3)
         else:
-            Cv_single = list(phase_fits.values())[0]['Cv']
+            Cv_single = phase_fits['Cv'].iloc[0]
             ax2.axhline(y=Cv_single, color='red', linewidth=2, zorder=3)
         
         ax2.set_ylabel(r'$C_v$ (meV/K)', fontsize=13, fontweight='bold', color='red')
         ax2.tick_params(axis='y', labelcolor='red', labelsize=11, color='red')
         ax2.spines['right'].set_color('red')
-        ax2.set_ylim(Cv_ylim)
+        ax2.margins(y=0.1)
         
         return ax2
     
-    def plot_single_fit(ax1, data, title):
+    def plot_single_fit(ax1, data, title, ax2_share=None):
         """绘制单一线性拟合图（不分区）"""
         temps = data['temps']
         E_rel = data['E_rel']
         E_std = data['E_std']
         
         # 左Y轴: 能量数据点
-        ax1.errorbar(temps, E_rel, yerr=E_std,
-                     fmt='o', markersize=7, color='black',
-                     ecolor='gray', elinewidth=1.5, capsize=3, capthick=1.5,
-                     zorder=5)
+        plot_energy_points(ax1, temps, E_rel, E_std)
         
         # 整体线性拟合（单一拟合线）
-        slope, intercept, r_value, _, std_err = linregress(temps, E_rel)
+        slope, intercept, R2, std_err = _linfit(temps, E_rel)
         Cv_overall = slope * 1000  # meV/K
         Cv_err = std_err * 1000
-        R2 = r_value ** 2
         
-        # 绘制拟合线
-        T_fit = np.linspace(temps.min(), temps.max(), 100)
+        # 绘制拟合线 (直线只需两个端点)
+        T_fit = np.array([temps.min(), temps.max()])
         E_fit = slope * T_fit + intercept
         ax1.plot(T_fit, E_fit, '-', color='black', linewidth=2, zorder=4)
         
         ax1.set_xlabel('Temperature (K)', fontsize=13, fontweight='bold')
         ax1.set_ylabel('Total Energy (eV)', fontsize=13, fontweight='bold')
-        ax1.set_ylim(E_ylim)
-        ax1.tick_params(axis='both', labelsize=11)
+        ax1.margins(y=0.1)
+        ax1.tick_params(axis='both', labelsize=11, labelleft=True)
         ax1.set_title(title, fontsize=14, fontweight='bold', pad=10)
         
         # 右Y轴: 热容（单一水平线）
         ax2 = ax1.twinx()
+        if ax2_share is not None:
+            ax2.sharey(ax2_share)
         ax2.axhline(y=Cv_overall, color='red', linewidth=2, zorder=3)
         
         ax2.set_ylabel(r'$C_v$ (meV/K)', fontsize=13, fontweight='bold', color='red')
         ax2.tick_params(axis='y', labelcolor='red', labelsize=11, color='red')
         ax2.spines['right'].set_color('red')
-        ax2.set_ylim(Cv_ylim)
+        ax2.margins(y=0.1)
         
         print(f"    单一拟合: Cv={Cv_overall:.2f}±{Cv_err:.2f} meV/K, R²={R2:.4f}")
         
-        return ax2, Cv_overall
+        return ax2, Cv_overall, (slope, intercept, R2, std_err)
     
     # ========== 绘制三个子图 ==========
     # 左图: Pt8Sn6 (Air86) - 分区拟合
     ax2_left = plot_single(ax1_left, data_86, r'Pt$_8$Sn$_6$')
     
     # 中图: Pt6Sn8 (Air68) - 分区拟合
-    ax2_mid = plot_single(ax1_mid, data_68, r'Pt$_6$Sn$_8$ (partition)')
+    ax2_mid = plot_single(ax1_mid, data_68, r'Pt$_6$Sn$_8$ (partition)', ax2_share=ax2_left)
     
     # 右图: Pt6Sn8 (Air68) - 单一拟合
     print(f"\n  Pt6Sn8 单一拟合:")
-    ax2_right, Cv_68_single = plot_single_fit(ax1_right, data_68, r'Pt$_6$Sn$_8$ (single fit)')
-    
-    plt.tight_layout()
+    ax2_right, Cv_68_single, single_fit = plot_single_fit(ax1_right, data_68, r'Pt$_6$Sn$_8$ (single fit)',
+                                                          ax2_share=ax2_left)
+    # 缓存单一拟合结果, 导出CSV时直接复用
+    data_68['_single_fit'] = single_fit
     
     # 保存
     output_file = output_dir / 'Air68_Air86_cv_combined.png'
-    plt.savefig(output_file, dpi=300, bbox_inches='tight', facecolor='white')
-    plt.close()
+    fig.savefig(output_file, dpi=300, bbox_inches='tight', facecolor='white')
     
     print(f"📊 组合图已保存: {output_file}")
     
@@ -340,27 +431,25 @@ def main():
         print(f"错误: 找不到 {csv_86}")
         return
     
-    print(f"\n>>> 加载数据...")
-    df_68 = load_cluster_data(csv_68)
-    df_86 = load_cluster_data(csv_86)
+    print(f"\n>>> 加载数据并计算分区热容...")
+    result_68 = load_and_compute(csv_68, 'Air68')
+    result_86 = load_and_compute(csv_86, 'Air86')
     
-    if df_68 is None or df_86 is None:
+    if result_68 is None or result_86 is None:
         return
     
-    print(f"    Air68: {len(df_68)} 条记录")
-    print(f"    Air86: {len(df_86)} 条记录")
+    n_68, data_68 = result_68
+    n_86, data_86 = result_86
     
-    # 计算分区数据
-    print(f"\n>>> 计算分区热容...")
-    data_68 = compute_partition_data(df_68, 'Air68')
-    data_86 = compute_partition_data(df_86, 'Air86')
+    print(f"    Air68: {n_68} 条记录")
+    print(f"    Air86: {n_86} 条记录")
     
     # 打印热容信息
     for name, data in [('Air68 (Pt6Sn8)', data_68), ('Air86 (Pt8Sn6)', data_86)]:
         print(f"\n  {name}:")
-        for phase, fit in data['phase_fits'].items():
+        for phase, fit in data['phase_fits_df'].iterrows():
             print(f"    {phase}: Cv={fit['Cv']:.2f}±{fit['Cv_err']:.2f} meV/K, "
-                  f"T={fit['T_range'][0]:.0f}-{fit['T_range'][1]:.0f}K")
+                  f"T={fit['T_min']:.0f}-{fit['T_max']:.0f}K")
         if data['T_boundary']:
             print(f"    分界温度: {data['T_boundary']:.0f} K")
     
@@ -395,102 +484,94 @@ def export_cv_data_to_csv(data_68, data_86, output_dir):
         print(f"    原始数据: {csv_path}")
     
     # 2. 导出拟合参数汇总
-    summary_rows = []
-    
-    # Air68 分区拟合
-    for phase, fit in data_68['phase_fits'].items():
-        summary_rows.append({
-            'System': 'Air68_Pt6Sn8',
+    def partition_summary(system, fits):
+        """把分区拟合参数表整体转换为汇总表的列"""
+        return pd.DataFrame({
+            'System': system,
             'Fit_Type': 'partition',
-            'Phase': phase,
-            'T_min_K': fit['T_range'][0],
-            'T_max_K': fit['T_range'][1],
-            'Cv_meV_K': fit['Cv'],
-            'Cv_err_meV_K': fit['Cv_err'],
-            'Intercept_meV': fit['intercept'],
-            'R_squared': fit['R2']
+            'Phase': fits.index,
+            'T_min_K': fits['T_min'].to_numpy(),
+            'T_max_K': fits['T_max'].to_numpy(),
+            'Cv_meV_K': fits['Cv'].to_numpy(),
+            'Cv_err_meV_K': fits['Cv_err'].to_numpy(),
+            'Intercept_meV': fits['intercept'].to_numpy(),
+            'R_squared': fits['R2'].to_numpy(),
         })
     
-    # Air68 单一拟合 (计算)
-    temps = np.array(data_68['temps'])
-    E_rel = np.array(data_68['E_rel'])
-    slope, intercept, r_value, _, std_err = linregress(temps, E_rel)
-    summary_rows.append({
-        'System': 'Air68_Pt6Sn8',
-        'Fit_Type': 'single_linear',
-        'Phase': 'all',
-        'T_min_K': temps.min(),
-        'T_max_K': temps.max(),
-        'Cv_meV_K': slope * 1000,
-        'Cv_err_meV_K': std_err * 1000,
-        'Intercept_meV': intercept,
-        'R_squared': r_value**2
+    # Air68 单一拟合 (优先复用绘图时缓存的结果)
+    temps = data_68['temps']
+    E_rel = data_68['E_rel']
+    if '_single_fit' in data_68:
+        slope, intercept, r2, std_err = data_68['_single_fit']
+    else:
+        slope, intercept, r2, std_err = _linfit(temps, E_rel)
+    single_summary = pd.DataFrame({
+        'System': ['Air68_Pt6Sn8'],
+        'Fit_Type': ['single_linear'],
+        'Phase': ['all'],
+        'T_min_K': [temps.min()],
+        'T_max_K': [temps.max()],
+        'Cv_meV_K': [slope * 1000],
+        'Cv_err_meV_K': [std_err * 1000],
+        'Intercept_meV': [intercept],
+        'R_squared': [r2],
     })
     
-    # Air86 分区拟合
-    for phase, fit in data_86['phase_fits'].items():
-        summary_rows.append({
-            'System': 'Air86_Pt8Sn6',
-            'Fit_Type': 'partition',
-            'Phase': phase,
-            'T_min_K': fit['T_range'][0],
-            'T_max_K': fit['T_range'][1],
-            'Cv_meV_K': fit['Cv'],
-            'Cv_err_meV_K': fit['Cv_err'],
-            'Intercept_meV': fit['intercept'],
-            'R_squared': fit['R2']
-        })
-    
-    df_summary = pd.DataFrame(summary_rows)
+    # Air68 分区拟合 + Air68 单一拟合 + Air86 分区拟合
+    df_summary = pd.concat([
+        partition_summary('Air68_Pt6Sn8', data_68['phase_fits_df']),
+        single_summary,
+        partition_summary('Air86_Pt8Sn6', data_86['phase_fits_df']),
+    ], ignore_index=True)
     csv_summary = output_dir / 'Air_cv_fitting_summary.csv'
     df_summary.to_csv(csv_summary, index=False)
     print(f"    拟合汇总: {csv_summary}")
     
-    # 3. 导出拟合线数据 (用于Origin精确绘制拟合线)
-    fit_lines = []
+    # 3. 导出拟合线数据 (用于Origin精确绘制拟合线; 拟合为直线, 每条只导出两个端点)
+    # 按列收集各拟合的温度/能量数组, 最后一次性拼接成 DataFrame
+    line_keys = []  # (System, Fit_Type, Phase, 点数)
+    T_cols = []
+    E_cols = []
+    
+    def add_fit_line(system, fit_type, phase, T_line, E_line):
+        line_keys.append((system, fit_type, phase, len(T_line)))
+        T_cols.append(T_line)
+        E_cols.append(E_line)
     
     # Air68 partition fits
-    for phase, fit in data_68['phase_fits'].items():
-        T_range = np.linspace(fit['T_range'][0], fit['T_range'][1], 50)
-        E_fit = fit['intercept'] + (fit['Cv']/1000) * T_range
-        for t, e in zip(T_range, E_fit):
-            fit_lines.append({
-                'System': 'Air68_Pt6Sn8',
-                'Fit_Type': 'partition',
-                'Phase': phase,
-                'Temperature_K': t,
-                'Energy_fit_meV': e
-            })
+    for fit in data_68['phase_fits_df'].itertuples():
+        T_range = np.array([fit.T_min, fit.T_max])
+        E_fit = fit.intercept + (fit.Cv/1000) * T_range
+        add_fit_line('Air68_Pt6Sn8', 'partition', fit.Index, T_range, E_fit)
     
     # Air68 single linear fit
-    T_full = np.linspace(temps.min(), temps.max(), 100)
+    T_full = np.array([temps.min(), temps.max()])
     E_single = intercept + slope * T_full
-    for t, e in zip(T_full, E_single):
-        fit_lines.append({
-            'System': 'Air68_Pt6Sn8',
-            'Fit_Type': 'single_linear',
-            'Phase': 'all',
-            'Temperature_K': t,
-            'Energy_fit_meV': e
-        })
+    add_fit_line('Air68_Pt6Sn8', 'single_linear', 'all', T_full, E_single)
     
     # Air86 partition fits
-    for phase, fit in data_86['phase_fits'].items():
-        T_range = np.linspace(fit['T_range'][0], fit['T_range'][1], 50)
-        E_fit = fit['intercept'] + (fit['Cv']/1000) * T_range
-        for t, e in zip(T_range, E_fit):
-            fit_lines.append({
-                'System': 'Air86_Pt8Sn6',
-                'Fit_Type': 'partition',
-                'Phase': phase,
-                'Temperature_K': t,
-                'Energy_fit_meV': e
-            })
-    
-    df_fit_lines = pd.DataFrame(fit_lines)
+    for fit in data_86['phase_fits_df'].itertuples():
+        T_range = np.array([fit.T_min, fit.T_max])
+        E_fit = fit.intercept + (fit.Cv/1000) * T_range
+        add_fit_line('Air86_Pt8Sn6', 'partition', fit.Index, T_range, E_fit)
+    
+    systems, fit_types, line_phases, n_points = zip(*line_keys)
+    df_fit_lines = pd.DataFrame({
+        'System': pd.Categorical(np.repeat(systems, n_points)),
+        'Fit_Type': pd.Categorical(np.repeat(fit_types, n_points)),
+        'Phase': pd.Categorical(np.repeat(line_phases, n_points)),
+        'Temperature_K': np.concatenate(T_cols),
+        'Energy_fit_meV': np.concatenate(E_cols),
+    })
     csv_fit = output_dir / 'Air_cv_fitting_lines.csv'
     df_fit_lines.to_csv(csv_fit, index=False)
     print(f"    拟合线: {csv_fit}")
+    
+    # 安装pyarrow时同时导出 parquet 版本 (列式二进制, 读写更快)
+    if HAS_PYARROW:
+        parquet_fit = csv_fit.with_suffix('.parquet')
+        df_fit_lines.to_parquet(parquet_fit, index=False)
+        print(f"    拟合线 (parquet): {parquet_fit}")
 
 
 if __name__ == '__main__':
@@ -23,16 +23,26 @@ Step 6.1.1: 分区热容拟合图 - 论文出图专用
 
 import os
 import sys
-import glob
+import csv
 import argparse
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # 只输出图片文件, 使用无界面后端
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
-from scipy.stats import linregress
+from matplotlib.collections import LineCollection
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
 # 设置高质量论文图样式
 plt.rcParams['font.sans-serif'] = ['Arial', 'DejaVu Sans', 'SimHei']
 plt.rcParams['axes.unicode_minus'] = False
@@ -55,53 +65,211 @@ PHASE_COLORS = {
 # 载体热容 (meV/K)
 CV_SUPPORT = 38.2151
 
+# 聚类结果文件名后缀
+CLUSTER_FILE_SUFFIX = '_kmeans_n2_clustered_data.csv'
+
+# 绘图用到的聚类结果列
+CLUSTER_COLUMNS = ['temp', 'avg_energy', 'phase_clustered']
+
+# 带峰热容曲线的采样点数
+T_PLOT_N = 500
+
+# 载体能量数据
+SUPPORT_CSV = 'data/lammps_energy/sup/energy_master_20251021_151520.csv'
+
 
 def find_clustering_results(base_dir='results/step6_1_clustering'):
     """查找所有可用的聚类结果"""
-    results = {}
-    # 使用实际的文件命名模式
-    pattern = os.path.join(base_dir, '*_kmeans_n2_clustered_data.csv')
-    files = glob.glob(pattern)
+    if not os.path.isdir(base_dir):
+        return {}
     
-    for f in files:
-        basename = os.path.basename(f)
-        structure = basename.replace('_kmeans_n2_clustered_data.csv', '')
-        results[structure] = f
+    # 使用实际的文件命名模式, 按后缀匹配并切掉后缀得到结构名
+    suffix = CLUSTER_FILE_SUFFIX
+    results = {entry.name[:-len(suffix)]: entry.path
+               for entry in os.scandir(base_dir)
+               if entry.name.endswith(suffix) and entry.is_file()}
     
     return results
 
 
-def load_support_energy_data():
-    """加载载体能量数据"""
-    support_csv = 'data/lammps_energy/sup/energy_master_20251021_151520.csv'
+def fast_linregress(x, y):
+    """
+    一元线性最小二乘拟合 (闭式解)
+    
+    与 scipy.stats.linregress 的 slope/intercept/r/stderr 定义一致,
+    对十几个点的小数组省去 scipy 的参数检查与额外统计量开销。
+    使用中心化的平方和, 避免温度量级较大时原始平方和相减的精度损失。
+    
+    返回: (slope, intercept, r_value, std_err)
+    """
+    n = len(x)
+    xm = x.mean()
+    ym = y.mean()
+    dx = x - xm
+    dy = y - ym
+    sxx = (dx * dx).sum()
+    sxy = (dx * dy).sum()
+    syy = (dy * dy).sum()
+    
+    slope = sxy / sxx
+    intercept = ym - slope * xm
+    r_value = sxy / np.sqrt(sxx * syy) if syy > 0 else 0.0
+    std_err = np.sqrt(max(syy - slope * sxy, 0.0) / (n - 2) / sxx) if n > 2 else 0.0
+    return slope, intercept, r_value, std_err
+
+
+def batched_linregress(x_list, y_list):
+    """
+    对多组 (x, y) 一次完成线性拟合 (分段回归)
+    
+    各组数据按行填入补零的二维数组, 用有效位掩码在 axis=1 上一次求出
+    各组的中心化平方和, 逐组结果与 fast_linregress 相同。
+    
+    返回: (slope, intercept, r_value, std_err), 均为长度为组数的数组
+    """
+    n = np.array([len(x) for x in x_list])
+    valid = np.arange(n.max()) < n[:, None]
+    
+    X = np.zeros(valid.shape)
+    Y = np.zeros(valid.shape)
+    X[valid] = np.concatenate(x_list)
+    Y[valid] = np.concatenate(y_list)
+    
+    xm = X.sum(axis=1) / n
+    ym = Y.sum(axis=1) / n
+    dx = np.where(valid, X - xm[:, None], 0.0)
+    dy = np.where(valid, Y - ym[:, None], 0.0)
+    sxx = (dx * dx).sum(axis=1)
+    sxy = (dx * dy).sum(axis=1)
+    syy = (dy * dy).sum(axis=1)
+    
+    slope = sxy / sxx
+    intercept = ym - slope * xm
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r_value = np.where(syy > 0, sxy / np.sqrt(sxx * syy), 0.0)
+        std_err = np.where(n > 2, np.sqrt(np.maximum(syy - slope * sxy, 0.0) / (n - 2) / sxx), 0.0)
+    return slope, intercept, r_value, std_err
+
+
+@lru_cache(maxsize=4)
+def load_support_energy_data(support_csv=SUPPORT_CSV):
+    """
+    加载载体能量数据, 返回线性拟合 (slope, intercept, R²)
     
+    结果按文件路径缓存, --structure all 时载体CSV只读取和拟合一次。
+    """
     if not os.path.exists(support_csv):
         return None
     
     try:
-        df_support = pd.read_csv(support_csv)
-        if 'temp' in df_support.columns and 'avg_energy' in df_support.columns:
-            T = df_support['temp'].values
-            E = df_support['avg_energy'].values
-            slope, intercept, r_value, _, _ = linregress(T, E)
-            return slope, intercept, r_value**2
+        # 只读取拟合用到的两列
+        df_support = pd.read_csv(
+            support_csv,
+            usecols=['temp', 'avg_energy'],
+            dtype={'temp': 'float64', 'avg_energy': 'float64'},
+            engine='pyarrow' if HAS_PYARROW else 'c',
+        )
+        T = np.ascontiguousarray(df_support['temp'].to_numpy(), dtype=np.float64)
+        E = np.ascontiguousarray(df_support['avg_energy'].to_numpy(), dtype=np.float64)
+        slope, intercept, r_value, _ = fast_linregress(T, E)
+        return slope, intercept, r_value**2
     except Exception as e:
         print(f"  警告: 读取载体能量数据失败: {e}")
     
     return None
 
 
-def load_cluster_data(csv_path):
-    """加载聚类结果数据"""
+def load_cluster_data(csv_path, cache_dir=None):
+    """
+    加载聚类结果数据
+    
+    安装pyarrow且给出 cache_dir 时, 读取的列缓存为 cache_dir/.cache 下的同名 .parquet 文件;
+    之后只要 parquet 不比 CSV 旧、且列与 CLUSTER_COLUMNS 一致就直接读取 parquet。
+    """
+    parquet_path = None
+    if HAS_PYARROW and cache_dir is not None:
+        parquet_path = Path(cache_dir) / '.cache' / Path(csv_path).with_suffix('.parquet').name
+    
+    if parquet_path is not None and parquet_path.exists() and \
+            parquet_path.stat().st_mtime >= os.path.getmtime(csv_path):
+        try:
+            df = pd.read_parquet(parquet_path)
+            if sorted(df.columns) == sorted(CLUSTER_COLUMNS):
+                return df
+        except Exception as e:
+            print(f"  警告: parquet 缓存读取失败, 改读CSV: {e}")
+    
     try:
-        df = pd.read_csv(csv_path)
-        return df
+        # 只读取绘图用到的三列 (相标签只有少数几种取值, 直接读为分类类型)
+        df = pd.read_csv(
+            csv_path,
+            usecols=CLUSTER_COLUMNS,
+            dtype={'temp': 'float64', 'avg_energy': 'float64', 'phase_clustered': 'category'},
+            engine='pyarrow' if HAS_PYARROW else 'c',
+        )
     except Exception as e:
         print(f"  错误: 无法读取 {csv_path}: {e}")
         return None
+    
+    if parquet_path is not None:
+        try:
+            parquet_path.parent.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(parquet_path, compression='snappy', index=False)
+        except Exception as e:
+            print(f"  警告: 无法写入 parquet 缓存 {parquet_path}: {e}")
+    
+    return df
+
+
+def plot_energy_points(ax, temps, E_mean, E_std):
+    """
+    绘制带误差棒的能量数据点
+    
+    外观与 ax.errorbar(fmt='o', markersize=7, capsize=3) 相同, 但误差棒合并为
+    一个 LineCollection, 端帽合并为一条 '_' 标记线, 数据点为一个 scatter,
+    避免 errorbar 为每个点生成独立的艺术家对象。
+    """
+    E_low = E_mean - E_std
+    E_high = E_mean + E_std
+    
+    # 竖直误差棒: 每个温度一段 (T, E-σ) -> (T, E+σ)
+    segments = np.stack([np.column_stack([temps, E_low]),
+                         np.column_stack([temps, E_high])], axis=1)
+    ax.add_collection(LineCollection(segments, colors='gray', linewidths=1.5, zorder=5))
+    
+    # 误差棒端帽 (marker 尺寸单位为点, 与 capsize=3 一致)
+    ax.plot(np.concatenate([temps, temps]), np.concatenate([E_low, E_high]),
+            linestyle='none', marker='_', markersize=6, markeredgewidth=1.5,
+            color='gray', zorder=5)
+    
+    # 数据点
+    ax.scatter(temps, E_mean, s=7**2, color='black', zorder=5, label='Data')
+    ax.autoscale_view()
+
+
+def _flush_log(lines):
+    """将收集的诊断信息一次写到标准输出"""
+    sys.stdout.write('\n'.join(lines) + '\n')
+    sys.stdout.flush()
 
 
-def plot_partition_cv(df, structure_name, output_dir, output_format='png', dpi=300):
+def plot_partition_cv(df, structure_name, output_dir, output_format='png', dpi=300,
+                      fig=None, ax1=None):
+    """
+    绘制分区热容拟合图, 参数与返回值见 _plot_partition_cv
+    
+    诊断信息先收集到列表, 每个结构结束时一次写出 (批量/多进程时日志不会交错);
+    中途出错时也会先写出已收集的部分, 再抛出异常。
+    """
+    log = []
+    try:
+        return _plot_partition_cv(df, structure_name, output_dir, output_format, dpi,
+                                  fig, ax1, log)
+    finally:
+        _flush_log(log)
+
+
+def _plot_partition_cv(df, structure_name, output_dir, output_format, dpi, fig, ax1, log):
     """
     绘制分区热容拟合图（论文出图专用）
     
@@ -110,14 +278,17 @@ def plot_partition_cv(df, structure_name, output_dir, output_format='png', dpi=3
     2. 使用多数投票规则将每个温度分配给唯一的相态
     3. 对每个相态的专属温度点进行线性拟合
     4. 绘制整体拟合线 vs 分区拟合线对比
+    
+    fig/ax1: 批量处理时由调用方传入并复用的图形和能量轴; 为 None 时新建并在保存后关闭
+    log: 诊断信息列表, 由 plot_partition_cv 统一写出
     """
     
-    print(f"\n>>> 绘制 {structure_name} 分区热容图...")
+    log.append(f"\n>>> 绘制 {structure_name} 分区热容图...")
     
     # 检查必要列
     required_cols = ['temp', 'avg_energy', 'phase_clustered']
     if not all(col in df.columns for col in required_cols):
-        print(f"  错误: 缺少必要列 {required_cols}")
+        log.append(f"  错误: 缺少必要列 {required_cols}")
         return None
     
     # 判断是否是 Air 系列（气相团簇）
@@ -127,112 +298,138 @@ def plot_partition_cv(df, structure_name, output_dir, output_format='png', dpi=3
     if is_air_system:
         slope_support = 0.0
         intercept_support = 0.0
-        print(f"  [Air系列] 气相纳米团簇，不扣除载体能量")
+        log.append(f"  [Air系列] 气相纳米团簇，不扣除载体能量")
     else:
-        support_fit = load_support_energy_data()
+        support_fit = load_support_energy_data(SUPPORT_CSV)
         if support_fit is not None:
             slope_support, intercept_support, R2_support = support_fit
-            print(f"  [载体数据] Cv_support={slope_support*1000:.4f} meV/K, R²={R2_support:.6f}")
+            log.append(f"  [载体数据] Cv_support={slope_support*1000:.4f} meV/K, R²={R2_support:.6f}")
         else:
             slope_support = CV_SUPPORT / 1000  # meV/K -> eV/K
             T_min = df['temp'].min()
             E_total_min = df[df['temp'] == T_min]['avg_energy'].mean()
             intercept_support = E_total_min * 0.9 - slope_support * T_min
-            print(f"  [警告] 使用默认Cv_support估算载体能量")
+            log.append(f"  [警告] 使用默认Cv_support估算载体能量")
     
     # ========== 1. 按温度分组计算团簇能量 ==========
-    temp_groups = df.groupby('temp')
-    temps_unique = []
-    E_cluster_mean = []
-    E_cluster_std = []
-    
-    for temp, group in temp_groups:
-        if is_air_system:
-            E_cluster = group['avg_energy'].values
-        else:
-            E_support = slope_support * temp + intercept_support
-            E_cluster = group['avg_energy'].values - E_support
-        
-        temps_unique.append(temp)
-        E_cluster_mean.append(np.mean(E_cluster))
-        E_cluster_std.append(np.std(E_cluster))
+    # 一次分组聚合总能量 (标准差与 np.std 一致取 ddof=0)
+    energy_by_temp = df['avg_energy'].groupby(df['temp'], sort=True)
+    agg = pd.DataFrame({
+        'mean': energy_by_temp.mean(),
+        'std': energy_by_temp.std(ddof=0),
+    })
+    
+    # 统一为连续 float64 数组 (回归与掩码切片都基于它们, 避免 object 等类型退化)
+    temps_unique = np.ascontiguousarray(agg.index.to_numpy(), dtype=np.float64)
+    # 均值后面会原地扣除载体能量, 需取独立副本 (Copy-on-Write 下 pandas 返回的数组只读)
+    E_cluster_mean = agg['mean'].to_numpy(dtype=np.float64, copy=True)
+    E_cluster_std = np.ascontiguousarray(agg['std'].to_numpy(), dtype=np.float64)
     
-    temps_unique = np.array(temps_unique)
-    E_cluster_mean = np.array(E_cluster_mean)
-    E_cluster_std = np.array(E_cluster_std)
+    # 扣除载体能量 (Air系列不扣除): 同一温度下载体能量为常数, 只需对各温度均值扣除,
+    # 标准差不受影响; 复用一个缓冲区原地计算, 不产生中间数组
+    if not is_air_system:
+        E_support = np.empty_like(E_cluster_mean)
+        np.multiply(temps_unique, slope_support, out=E_support)
+        np.add(E_support, intercept_support, out=E_support)
+        np.subtract(E_cluster_mean, E_support, out=E_cluster_mean)
+    
+    # 温度 -> 数组下标, 按温度取值时用哈希查找代替 np.where 扫描
+    temp_index = {t: i for i, t in enumerate(temps_unique)}
     
     # 计算相对能量（相对于最低温度）
     E_cluster_ref = E_cluster_mean.min()
     E_cluster_mean_rel = E_cluster_mean - E_cluster_ref
     
     # ========== 2. 多数投票确定每个温度的专属相态 ==========
-    temp_to_partition = {}
-    print(f"\n  多数投票温度分配:")
-    
-    for temp in temps_unique:
-        df_temp = df[df['temp'] == temp]
-        partition_counts = df_temp['phase_clustered'].value_counts()
-        dominant_partition = partition_counts.idxmax()
-        temp_to_partition[temp] = dominant_partition
-        print(f"    T={temp:4.0f}K: {dict(partition_counts)} → {dominant_partition}")
+    # 一次分组计数; sort=False 保留每个温度内各相的首次出现顺序, 平票时与 value_counts().idxmax() 结果一致
+    # (observed=True: 分类类型只统计实际出现的组合)
+    counts = df.groupby(['temp', 'phase_clustered'], sort=False, observed=True).size()
+    winners = counts.groupby(level='temp', sort=False).idxmax()  # 之后按 temps_unique 取值, 无需排序
+    temp_to_partition = pd.Series([phase for _, phase in winners.loc[temps_unique]],
+                                  index=temps_unique, name='phase')
+    
+    # 输出各温度的计数 (稳定排序后按计数降序, 与 value_counts 的显示顺序相同)
+    log.append(f"\n  多数投票温度分配:")
+    counts_desc = counts.sort_values(ascending=False, kind='stable')
+    for temp, temp_counts in counts_desc.groupby(level='temp', sort=True):
+        log.append(f"    T={temp:4.0f}K: {dict(temp_counts.droplevel('temp'))} → {temp_to_partition[temp]}")
     
     # ========== 3. 整体拟合 ==========
     if len(temps_unique) < 3:
-        print(f"  错误: 温度点不足 ({len(temps_unique)} < 3)")
+        log.append(f"  错误: 温度点不足 ({len(temps_unique)} < 3)")
         return None
     
-    slope_overall, intercept_overall, r_value_overall, _, std_err_overall = linregress(
+    slope_overall, intercept_overall, r_value_overall, std_err_overall = fast_linregress(
         temps_unique, E_cluster_mean_rel)
     R2_overall = r_value_overall ** 2
     Cv_overall = slope_overall * 1000  # meV/K
     Cv_overall_err = std_err_overall * 1000
     
-    print(f"\n  整体拟合: Cv={Cv_overall:.4f}±{Cv_overall_err:.4f} meV/K, R²={R2_overall:.4f}")
+    log.append(f"\n  整体拟合: Cv={Cv_overall:.4f}±{Cv_overall_err:.4f} meV/K, R²={R2_overall:.4f}")
     
     # ========== 4. 分区拟合 ==========
     phases = df['phase_clustered'].unique()
     phase_fits = {}
     
+    # 先收集每个相态 (至少2个温度点) 的数据
+    phase_data = []
+    # 一次分组得到 相态 -> 温度数组 (温度已升序)
+    phase_to_temps = {ph: s.index.to_numpy()
+                      for ph, s in temp_to_partition.groupby(temp_to_partition, sort=False)}
+    
     for phase in phases:
-        phase_temps = [temp for temp, part in temp_to_partition.items() if part == phase]
-        phase_temps = sorted(phase_temps)
+        phase_temps = phase_to_temps.get(phase, [])
         
         if len(phase_temps) >= 2:
-            mask = np.isin(temps_unique, phase_temps)
-            T_phase = temps_unique[mask]
-            E_phase_rel = E_cluster_mean_rel[mask]
-            E_phase_std = E_cluster_std[mask]
-            
-            slope_ph, intercept_ph, r_value_ph, _, std_err_ph = linregress(T_phase, E_phase_rel)
-            R2_ph = r_value_ph ** 2
-            Cv_ph = slope_ph * 1000
-            Cv_ph_err = std_err_ph * 1000
-            
-            phase_fits[phase] = {
-                'slope': slope_ph,
-                'intercept': intercept_ph,
-                'R2': R2_ph,
-                'Cv': Cv_ph,
-                'Cv_err': Cv_ph_err,
-                'n_temps': len(T_phase),
-                'T_range': (T_phase.min(), T_phase.max()),
-                'T_data': T_phase,
-                'E_data': E_phase_rel,
-                'E_std': E_phase_std
-            }
-            
-            print(f"  {phase}: Cv={Cv_ph:.4f}±{Cv_ph_err:.4f} meV/K, R²={R2_ph:.4f}, "
-                  f"n={len(T_phase)}, T={T_phase.min():.0f}-{T_phase.max():.0f}K")
+            # temps_unique 已升序, 二分查找得到下标后直接取值
+            idx = np.searchsorted(temps_unique, phase_temps)
+            phase_data.append((phase, temps_unique[idx], E_cluster_mean_rel[idx],
+                               E_cluster_std[idx]))
+    
+    # 所有相态的拟合一次完成
+    if phase_data:
+        slopes, intercepts, r_values, std_errs = batched_linregress(
+            [d[1] for d in phase_data], [d[2] for d in phase_data])
+    
+    for k, (phase, T_phase, E_phase_rel, E_phase_std) in enumerate(phase_data):
+        slope_ph = slopes[k]
+        intercept_ph = intercepts[k]
+        r_value_ph = r_values[k]
+        std_err_ph = std_errs[k]
+        R2_ph = r_value_ph ** 2
+        Cv_ph = slope_ph * 1000
+        Cv_ph_err = std_err_ph * 1000
+        
+        phase_fits[phase] = {
+            'slope': slope_ph,
+            'intercept': intercept_ph,
+            'R2': R2_ph,
+            'Cv': Cv_ph,
+            'Cv_err': Cv_ph_err,
+            'n_temps': len(T_phase),
+            'T_range': (T_phase.min(), T_phase.max()),
+            'T_data': T_phase,
+            'E_data': E_phase_rel,
+            'E_std': E_phase_std
+        }
+        
+        log.append(f"  {phase}: Cv={Cv_ph:.4f}±{Cv_ph_err:.4f} meV/K, R²={R2_ph:.4f}, "
+              f"n={len(T_phase)}, T={T_phase.min():.0f}-{T_phase.max():.0f}K")
     
     # ========== 5. 绘制简洁的双Y轴图 ==========
-    fig, ax1 = plt.subplots(figsize=(8, 6))
+    own_fig = fig is None
+    if own_fig:
+        fig, ax1 = plt.subplots(figsize=(8, 6), constrained_layout=False)
+    else:
+        # 复用图形: 移除上一个结构的热容轴, 清空能量轴
+        for ax in fig.axes:
+            if ax is not ax1:
+                ax.remove()
+        ax1.cla()
     
     # ----- 左Y轴: 能量-温度数据点（带误差棒）和拟合线 -----
     # 绘制数据点（带误差棒）
-    ax1.errorbar(temps_unique, E_cluster_mean_rel, yerr=E_cluster_std,
-                 fmt='o', markersize=7, color='black', 
-                 ecolor='gray', elinewidth=1.5, capsize=3, capthick=1.5,
-                 zorder=5, label='Data')
+    plot_energy_points(ax1, temps_unique, E_cluster_mean_rel, E_cluster_std)
     
     # 绘制拟合线（黑色）
     phases_sorted = sorted(phase_fits.keys())
@@ -248,16 +445,16 @@ def plot_partition_cv(df, structure_name, output_dir, output_format='png', dpi=3
         fit2 = phase_fits[phases_sorted[1]]
         # 分区1的最后一个数据点
         T1_end = fit1['T_range'][1]
-        idx1 = np.where(temps_unique == T1_end)[0]
-        if len(idx1) > 0:
-            E1_end = E_cluster_mean_rel[idx1[0]]
+        i1 = temp_index.get(T1_end)
+        if i1 is not None:
+            E1_end = E_cluster_mean_rel[i1]
         else:
             E1_end = fit1['slope'] * T1_end + fit1['intercept']
         # 分区2的第一个数据点
         T2_start = fit2['T_range'][0]
-        idx2 = np.where(temps_unique == T2_start)[0]
-        if len(idx2) > 0:
-            E2_start = E_cluster_mean_rel[idx2[0]]
+        i2 = temp_index.get(T2_start)
+        if i2 is not None:
+            E2_start = E_cluster_mean_rel[i2]
         else:
             E2_start = fit2['slope'] * T2_start + fit2['intercept']
         # 用实线连接两个数据点
@@ -278,24 +475,24 @@ def plot_partition_cv(df, structure_name, output_dir, output_format='png', dpi=3
     
     if len(phases_sorted) >= 2:
         # 找到分区边界温度
-        phase1_temps = [t for t, p in temp_to_partition.items() if p == phases_sorted[0]]
-        phase2_temps = [t for t, p in temp_to_partition.items() if p == phases_sorted[1]]
+        phase1_temps = phase_to_temps.get(phases_sorted[0], [])
+        phase2_temps = phase_to_temps.get(phases_sorted[1], [])
         
-        if phase1_temps and phase2_temps:
-            T1_last = max(phase1_temps)   # 分区1最后一个温度
-            T2_first = min(phase2_temps)  # 分区2第一个温度
+        if len(phase1_temps) > 0 and len(phase2_temps) > 0:
+            T1_last = phase1_temps[-1]   # 分区1最后一个温度
+            T2_first = phase2_temps[0]   # 分区2第一个温度
             T_boundary = (T1_last + T2_first) / 2
-            print(f"\n  分界温度: {T_boundary:.0f} K (过渡区: {T1_last:.0f}-{T2_first:.0f}K)")
+            log.append(f"\n  分界温度: {T_boundary:.0f} K (过渡区: {T1_last:.0f}-{T2_first:.0f}K)")
             
             Cv1 = phase_fits[phases_sorted[0]]['Cv']
             Cv2 = phase_fits[phases_sorted[1]]['Cv']
             
             # 计算过渡区热容（数值微分）
-            idx1 = np.where(temps_unique == T1_last)[0]
-            idx2 = np.where(temps_unique == T2_first)[0]
-            if len(idx1) > 0 and len(idx2) > 0:
-                E1 = E_cluster_mean_rel[idx1[0]]
-                E2 = E_cluster_mean_rel[idx2[0]]
+            i1 = temp_index.get(T1_last)
+            i2 = temp_index.get(T2_first)
+            if i1 is not None and i2 is not None:
+                E1 = E_cluster_mean_rel[i1]
+                E2 = E_cluster_mean_rel[i2]
                 Cv_transition = (E2 - E1) / (T2_first - T1_last) * 1000  # meV/K
             else:
                 Cv_transition = (Cv1 + Cv2) / 2
@@ -305,24 +502,22 @@ def plot_partition_cv(df, structure_name, output_dir, output_format='png', dpi=3
             
             if has_peak:
                 Cv_peak = Cv_transition
-                print(f"  ★ 存在热容峰: Cv_peak={Cv_peak:.2f} meV/K (过渡区)")
-                print(f"  热容: Cv1={Cv1:.2f}, Cv_peak={Cv_peak:.2f}, Cv2={Cv2:.2f} meV/K")
+                log.append(f"  ★ 存在热容峰: Cv_peak={Cv_peak:.2f} meV/K (过渡区)")
+                log.append(f"  热容: Cv1={Cv1:.2f}, Cv_peak={Cv_peak:.2f}, Cv2={Cv2:.2f} meV/K")
                 
                 # 绘制带平滑峰的热容曲线（使用高斯峰 + sigmoid过渡）
-                T_plot = np.linspace(temps_unique.min(), temps_unique.max(), 500)
-                Cv_plot = np.zeros_like(T_plot)
+                T_plot = np.linspace(temps_unique.min(), temps_unique.max(), T_PLOT_N)
                 
                 # 峰的宽度参数
                 sigma = (T2_first - T1_last) / 2  # 高斯宽度
                 
-                for i, T in enumerate(T_plot):
-                    # 基线：sigmoid 从 Cv1 过渡到 Cv2
-                    transition = 1 / (1 + np.exp(-(T - T_boundary) / (sigma * 0.5)))
-                    baseline = Cv1 + (Cv2 - Cv1) * transition
-                    
-                    # 高斯峰叠加
-                    gaussian = (Cv_peak - baseline) * np.exp(-0.5 * ((T - T_boundary) / sigma)**2)
-                    Cv_plot[i] = baseline + gaussian
+                # 基线：sigmoid 从 Cv1 过渡到 Cv2 (对整个温度数组一次计算)
+                transition = 1 / (1 + np.exp(-(T_plot - T_boundary) / (sigma * 0.5)))
+                baseline = Cv1 + (Cv2 - Cv1) * transition
+                
+                # 高斯峰叠加
+                gaussian = (Cv_peak - baseline) * np.exp(-0.5 * ((T_plot - T_boundary) / sigma)**2)
+                Cv_plot = baseline + gaussian
                 
                 ax2.plot(T_plot, Cv_plot, 'r-', linewidth=2, zorder=3)
                 
@@ -330,12 +525,18 @@ def plot_partition_cv(df, structure_name, output_dir, output_format='png', dpi=3
                 T_cv = np.array([temps_unique.min(), T1_last, T_boundary, T2_first, temps_unique.max()])
                 Cv_curve = np.array([Cv1, Cv1, Cv_peak, Cv2, Cv2])
             else:
-                print(f"  热容: Cv1={Cv1:.2f} meV/K, Cv2={Cv2:.2f} meV/K (无峰)")
+                log.append(f"  热容: Cv1={Cv1:.2f} meV/K, Cv2={Cv2:.2f} meV/K (无峰)")
                 
-                # 绘制阶梯形热容曲线（无峰）
-                ax2.plot([temps_unique.min(), T_boundary], [Cv1, Cv1], 'r-', linewidth=2, zorder=3)
-                ax2.plot([T_boundary, T_boundary], [Cv1, Cv2], 'r--', linewidth=1.5, zorder=3)
-                ax2.plot([T_boundary, temps_unique.max()], [Cv2, Cv2], 'r-', linewidth=2, zorder=3)
+                # 绘制阶梯形热容曲线（无峰）: 两段水平实线 + 分界处竖直虚线, 合并为一个集合
+                step_segments = [
+                    [(temps_unique.min(), Cv1), (T_boundary, Cv1)],
+                    [(T_boundary, Cv1), (T_boundary, Cv2)],
+                    [(T_boundary, Cv2), (temps_unique.max(), Cv2)],
+                ]
+                ax2.add_collection(LineCollection(step_segments, colors='red',
+                                                  linestyles=['-', '--', '-'],
+                                                  linewidths=[2, 1.5, 2], zorder=3))
+                ax2.autoscale_view()
                 
                 T_cv = np.array([temps_unique.min(), T_boundary - 0.1, T_boundary, T_boundary + 0.1, temps_unique.max()])
                 Cv_curve = np.array([Cv1, Cv1, (Cv1 + Cv2) / 2, Cv2, Cv2])
@@ -361,14 +562,16 @@ def plot_partition_cv(df, structure_name, output_dir, output_format='png', dpi=3
     
     ax1.set_title(f'{structure_name}', fontsize=14, fontweight='bold', pad=10)
     
-    plt.tight_layout()
+    # 固定 8×6 英寸单图, 边距直接给定, 不再运行 tight_layout 求解
+    fig.subplots_adjust(left=0.12, right=0.88, top=0.93, bottom=0.12)
     
     # 保存图片
     output_file = Path(output_dir) / f'{structure_name}_partition_cv.{output_format}'
-    plt.savefig(output_file, dpi=dpi, bbox_inches='tight', facecolor='white')
-    plt.close()
+    fig.savefig(output_file, dpi=dpi, bbox_inches='tight', facecolor='white')
+    if own_fig:
+        plt.close(fig)
     
-    print(f"\n  图已保存: {output_file}")
+    log.append(f"\n  图已保存: {output_file}")
     
     # ========== 6. 导出数据供 Origin 使用 ==========
     # 导出能量数据
@@ -376,11 +579,11 @@ def plot_partition_cv(df, structure_name, output_dir, output_format='png', dpi=3
         'Temperature_K': temps_unique,
         'Energy_eV': E_cluster_mean_rel,
         'Energy_std_eV': E_cluster_std,
-        'Partition': [temp_to_partition.get(t, 'unknown') for t in temps_unique]
+        'Partition': temp_to_partition.to_numpy()
     })
     energy_csv = Path(output_dir) / f'{structure_name}_energy_data.csv'
     df_energy.to_csv(energy_csv, index=False)
-    print(f"  能量数据已导出: {energy_csv}")
+    log.append(f"  能量数据已导出: {energy_csv}")
     
     # 导出热容数据（阶梯函数关键点）
     df_cv = pd.DataFrame({
@@ -389,7 +592,7 @@ def plot_partition_cv(df, structure_name, output_dir, output_format='png', dpi=3
     })
     cv_csv = Path(output_dir) / f'{structure_name}_cv_curve.csv'
     df_cv.to_csv(cv_csv, index=False)
-    print(f"  热容曲线已导出: {cv_csv}")
+    log.append(f"  热容曲线已导出: {cv_csv}")
     
     # 导出拟合参数汇总
     fit_summary = {
@@ -410,8 +613,12 @@ def plot_partition_cv(df, structure_name, output_dir, output_format='png', dpi=3
         fit_summary[f'phase_{i+1}_intercept_eV'] = fit['intercept']
     
     fit_csv = Path(output_dir) / f'{structure_name}_fit_params.csv'
-    pd.DataFrame([fit_summary]).to_csv(fit_csv, index=False)
-    print(f"  拟合参数已导出: {fit_csv}")
+    # 单行汇总直接用 csv 模块写出, 不经过 DataFrame
+    with open(fit_csv, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(fit_summary.keys()), lineterminator='\n')
+        writer.writeheader()
+        writer.writerow(fit_summary)
+    log.append(f"  拟合参数已导出: {fit_csv}")
     
     # 返回拟合结果
     return {
@@ -421,6 +628,30 @@ def plot_partition_cv(df, structure_name, output_dir, output_format='png', dpi=3
     }
 
 
+# 每个进程复用的图形和能量轴 (由 _run_one 首次调用时创建)
+_FIG = None
+_AX1 = None
+
+
+def _run_one(structure_name, csv_path, output_dir, output_format, dpi):
+    """
+    处理单个结构: 读取聚类结果并绘图导出 (模块级函数, 可被进程池调用)
+    
+    同一进程内处理的多个结构复用同一个图形。读取失败或绘图失败时返回 None。
+    """
+    global _FIG, _AX1
+    df = load_cluster_data(csv_path, cache_dir=output_dir)
+    if df is None:
+        return None
+    
+    if _FIG is None:
+        plt.ioff()
+        _FIG, _AX1 = plt.subplots(figsize=(8, 6), constrained_layout=False)
+    
+    return plot_partition_cv(df, structure_name, output_dir, output_format, dpi,
+                             fig=_FIG, ax1=_AX1)
+
+
 def list_available_structures(base_dir='results/step6_1_clustering'):
     """列出所有可用的结构"""
     results = find_clustering_results(base_dir)
@@ -526,6 +757,7 @@ def main():
     results = []
     success = 0
     failed = 0
+    tasks = []
     
     for structure in structures:
         # 查找结构（大小写不敏感）
@@ -540,16 +772,20 @@ def main():
             failed += 1
             continue
         
-        csv_path = available[found_name]
-        df = load_cluster_data(csv_path)
-        
-        if df is None:
-            failed += 1
-            continue
-        
-        result = plot_partition_cv(df, found_name, output_dir, 
-                                   args.format, args.dpi)
-        
+        tasks.append((found_name, available[found_name]))
+    
+    # 各结构互不依赖: 多个结构时分发到进程池并行处理, 结果按原顺序收集
+    if len(tasks) > 1:
+        n_workers = min(os.cpu_count() or 1, len(tasks))
+        with ProcessPoolExecutor(max_workers=n_workers) as ex:
+            futures = [ex.submit(_run_one, name, csv_path, output_dir, args.format, args.dpi)
+                       for name, csv_path in tasks]
+            task_results = [f.result() for f in futures]
+    else:
+        task_results = [_run_one(name, csv_path, output_dir, args.format, args.dpi)
+                        for name, csv_path in tasks]
+    
+    for result in task_results:
         if result:
             results.append(result)
             success += 1
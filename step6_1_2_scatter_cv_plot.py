@@ -120,10 +120,17 @@ Step 6.1.2: 分区散点图 + 热容双Y轴图 + f图（分区分布）
 
 import os
 import sys
+import csv
 import glob
 import argparse
+import contextlib
+import io
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # 只输出图片文件, 使用无界面后端
 import matplotlib.pyplot as plt
 from scipy.stats import linregress
 from pathlib import Path
@@ -151,6 +158,9 @@ PARTITION_COLORS = {
 # 载体热容 (meV/K)
 CV_SUPPORT = 38.2151
 
+# 载体能量数据
+SUPPORT_CSV = 'data/lammps_energy/sup/energy_master_20251021_151520.csv'
+
 
 def find_clustering_results(base_dir='results/step6_1_clustering'):
     """查找所有可用的聚类结果"""
@@ -166,10 +176,9 @@ def find_clustering_results(base_dir='results/step6_1_clustering'):
     return results
 
 
-def load_support_energy_data():
-    """加载载体能量数据"""
-    support_csv = 'data/lammps_energy/sup/energy_master_20251021_151520.csv'
-    
+@lru_cache(maxsize=4)
+def load_support_energy_data(support_csv=SUPPORT_CSV):
+    """加载载体能量数据并拟合 (同一进程内多次调用复用首次结果)"""
     if not os.path.exists(support_csv):
         return None
     
@@ -206,6 +215,12 @@ def plot_scatter_cv(df, structure_name, output_dir, output_format='png', dpi=300
         print(f"  错误: 缺少必要列 {required_cols}")
         return None
     
+    # 按温度稳定排序一次: 同温度的行连续存放（组内保持原顺序），
+    # 之后取某温度的数据直接切片，不再逐次构造布尔掩码
+    df = df.sort_values('temp', kind='mergesort').reset_index(drop=True)
+    temps_sorted = df['temp'].to_numpy()
+    n_T_min = np.searchsorted(temps_sorted, temps_sorted[0], side='right')  # 最低温度行数
+    
     # 判断是否是 Air 系列
     is_air_system = structure_name.startswith('Air') or structure_name in ['68', '86']
     
@@ -215,13 +230,13 @@ def plot_scatter_cv(df, structure_name, output_dir, output_format='png', dpi=300
         intercept_support = 0.0
         print(f"  [Air系列] 气相纳米团簇，不扣除载体能量")
     else:
-        support_fit = load_support_energy_data()
+        support_fit = load_support_energy_data(SUPPORT_CSV)
         if support_fit is not None:
             slope_support, intercept_support, R2_support = support_fit
         else:
             slope_support = CV_SUPPORT / 1000
-            T_min = df['temp'].min()
-            E_total_min = df[df['temp'] == T_min]['avg_energy'].mean()
+            T_min = temps_sorted[0]
+            E_total_min = df['avg_energy'].iloc[:n_T_min].mean()
             intercept_support = E_total_min * 0.9 - slope_support * T_min
             print(f"  [警告] 使用默认Cv_support估算载体能量")
     
@@ -232,25 +247,30 @@ def plot_scatter_cv(df, structure_name, output_dir, output_format='png', dpi=300
         df['E_cluster'] = df['avg_energy'] - (slope_support * df['temp'] + intercept_support)
     
     # 计算相对能量（相对于最低温度的平均值）
-    E_ref = df[df['temp'] == df['temp'].min()]['E_cluster'].mean()
+    E_ref = df['E_cluster'].iloc[:n_T_min].mean()
     df['E_cluster_rel'] = df['E_cluster'] - E_ref
     
     # ========== 2. 按温度分组统计 ==========
-    temp_groups = df.groupby('temp')
-    temps_unique = np.array(sorted(df['temp'].unique()))
-    E_mean = np.array([temp_groups.get_group(t)['E_cluster_rel'].mean() for t in temps_unique])
-    E_std = np.array([temp_groups.get_group(t)['E_cluster_rel'].std() for t in temps_unique])
+    # 一次 groupby 同时得到均值和标准差（std 为 pandas 默认 ddof=1）
+    temp_stats = df.groupby('temp', sort=True)['E_cluster_rel'].agg(['mean', 'std'])
+    temps_unique = temp_stats.index.to_numpy()
+    E_mean = temp_stats['mean'].to_numpy()
+    E_std = temp_stats['std'].to_numpy()
+    
+    # 温度 -> temps_unique 中的下标
+    temp_index = {t: i for i, t in enumerate(temps_unique)}
     
     # ========== 3. 多数投票确定每个温度的分区 ==========
-    temp_to_partition = {}
-    print(f"\n  多数投票温度分配:")
+    # 各 (温度, 分区) 的 run 数; 平票时取该温度下先出现的分区
+    phase_counts = df.groupby(['temp', 'phase_clustered'], sort=False).size()
+    winners = phase_counts.groupby(level='temp', sort=False).idxmax()
+    temp_to_partition = {temp: phase for temp, phase in winners.loc[temps_unique]}
     
-    for temp in temps_unique:
-        df_temp = df[df['temp'] == temp]
-        partition_counts = df_temp['phase_clustered'].value_counts()
-        dominant_partition = partition_counts.idxmax()
-        temp_to_partition[temp] = dominant_partition
-        print(f"    T={temp:4.0f}K: {dict(partition_counts)} -> {dominant_partition}")
+    # 每个温度按计数从多到少打印
+    print(f"\n  多数投票温度分配:")
+    phase_counts_desc = phase_counts.sort_values(ascending=False, kind='stable')
+    for temp, temp_counts in phase_counts_desc.groupby(level='temp', sort=True):
+        print(f"    T={temp:4.0f}K: {dict(temp_counts.droplevel('temp'))} -> {temp_to_partition[temp]}")
     
     # ========== 4. 分区拟合 ==========
     phases = sorted(df['phase_clustered'].unique())
@@ -261,9 +281,9 @@ def plot_scatter_cv(df, structure_name, output_dir, output_format='png', dpi=300
         phase_temps = sorted(phase_temps)
         
         if len(phase_temps) >= 2:
-            mask = np.isin(temps_unique, phase_temps)
-            T_phase = temps_unique[mask]
-            E_phase = E_mean[mask]
+            idxs = np.array([temp_index[t] for t in phase_temps])
+            T_phase = temps_unique[idxs]
+            E_phase = E_mean[idxs]
             
             slope_ph, intercept_ph, r_value_ph, _, std_err_ph = linregress(T_phase, E_phase)
             
@@ -298,12 +318,12 @@ def plot_scatter_cv(df, structure_name, output_dir, output_format='png', dpi=300
             Cv2 = phase_fits[phases_sorted[1]]['Cv']
             
             # 用分界点两侧的平均能量求数值微分
-            idx1 = np.where(temps_unique == T1_last)[0]
-            idx2 = np.where(temps_unique == T2_first)[0]
+            idx1 = temp_index.get(T1_last)
+            idx2 = temp_index.get(T2_first)
             
-            if len(idx1) > 0 and len(idx2) > 0:
-                E1 = E_mean[idx1[0]]
-                E2 = E_mean[idx2[0]]
+            if idx1 is not None and idx2 is not None:
+                E1 = E_mean[idx1]
+                E2 = E_mean[idx2]
                 Cv_transition = (E2 - E1) / (T2_first - T1_last) * 1000  # meV/K
                 
                 # 判断是否存在热容峰
@@ -318,7 +338,8 @@ def plot_scatter_cv(df, structure_name, output_dir, output_format='png', dpi=300
             print(f"  热容: Cv1={Cv1:.2f}, Cv2={Cv2:.2f} meV/K")
     
     # ========== 6. 计算每个温度的分区分布（用于f图）==========
-    temp_phase_counts = df.groupby(['temp', 'phase_clustered']).size().unstack(fill_value=0)
+    # 复用多数投票的计数表, 不再重复分组
+    temp_phase_counts = phase_counts.unstack(fill_value=0)
     temp_sorted = sorted(df['temp'].unique())
     
     # ========== 7. 绘制双Y轴散点图（如果add_f_plot则创建双图布局）==========
@@ -353,11 +374,11 @@ def plot_scatter_cv(df, structure_name, output_dir, output_format='png', dpi=300
         T1_end = fit1['T_range'][1]
         T2_start = fit2['T_range'][0]
         
-        idx1 = np.where(temps_unique == T1_end)[0]
-        idx2 = np.where(temps_unique == T2_start)[0]
-        if len(idx1) > 0 and len(idx2) > 0:
-            E1_end = E_mean[idx1[0]]
-            E2_start = E_mean[idx2[0]]
+        idx1 = temp_index.get(T1_end)
+        idx2 = temp_index.get(T2_start)
+        if idx1 is not None and idx2 is not None:
+            E1_end = E_mean[idx1]
+            E2_start = E_mean[idx2]
             ax1.plot([T1_end, T2_start], [E1_end, E2_start], 
                     '--', color='gray', linewidth=1.5, zorder=2)
     
@@ -371,24 +392,18 @@ def plot_scatter_cv(df, structure_name, output_dir, output_format='png', dpi=300
     
     if len(phases_sorted) >= 2 and Cv1 is not None and Cv2 is not None:
         T_plot = np.linspace(temps_unique.min(), temps_unique.max(), 500)
-        Cv_plot = np.zeros_like(T_plot)
         
         if Cv_peak is not None:
-            # 有热容峰：平滑高斯峰
+            # 有热容峰：平滑高斯峰（整段数组一次计算）
             sigma = (T2_first - T1_last) / 2
             
-            for i, T in enumerate(T_plot):
-                transition = 1 / (1 + np.exp(-(T - T_boundary) / (sigma * 0.5)))
-                baseline = Cv1 + (Cv2 - Cv1) * transition
-                gaussian = (Cv_peak - baseline) * np.exp(-0.5 * ((T - T_boundary) / sigma)**2)
-                Cv_plot[i] = baseline + gaussian
+            transition = 1 / (1 + np.exp(-(T_plot - T_boundary) / (sigma * 0.5)))
+            baseline = Cv1 + (Cv2 - Cv1) * transition
+            gaussian = (Cv_peak - baseline) * np.exp(-0.5 * ((T_plot - T_boundary) / sigma)**2)
+            Cv_plot = baseline + gaussian
         else:
             # 无热容峰：阶梯函数
-            for i, T in enumerate(T_plot):
-                if T < T_boundary:
-                    Cv_plot[i] = Cv1
-                else:
-                    Cv_plot[i] = Cv2
+            Cv_plot = np.where(T_plot < T_boundary, Cv1, Cv2)
         
         ax2.plot(T_plot, Cv_plot, 'r-', linewidth=2.5, zorder=5, label='Cv')
         
@@ -453,10 +468,10 @@ def plot_scatter_cv(df, structure_name, output_dir, output_format='png', dpi=300
     
     # ========== 9. 导出数据供 Origin 使用 ==========
     # 导出散点数据
-    df_scatter = df[['temp', 'E_cluster_rel', 'phase_clustered']].copy()
-    df_scatter.columns = ['Temperature_K', 'Energy_eV', 'Partition']
+    # 直接按列名选列并改表头写出, 不另外复制一份 DataFrame
     scatter_csv = Path(output_dir) / f'{structure_name}_scatter_data.csv'
-    df_scatter.to_csv(scatter_csv, index=False)
+    df.to_csv(scatter_csv, columns=['temp', 'E_cluster_rel', 'phase_clustered'],
+              header=['Temperature_K', 'Energy_eV', 'Partition'], index=False)
     print(f"  散点数据已导出: {scatter_csv}")
     
     # 导出平均能量数据
@@ -508,7 +523,11 @@ def plot_scatter_cv(df, structure_name, output_dir, output_format='png', dpi=300
         fit_summary[f'phase_{i+1}_T_max_K'] = fit['T_range'][1]
     
     fit_csv = Path(output_dir) / f'{structure_name}_fit_params.csv'
-    pd.DataFrame([fit_summary]).to_csv(fit_csv, index=False)
+    # 单行汇总直接用 csv 模块写出, 不经过 DataFrame
+    with open(fit_csv, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(fit_summary.keys()), lineterminator='\n')
+        writer.writeheader()
+        writer.writerow(fit_summary)
     print(f"  拟合参数已导出: {fit_csv}")
     
     return {
@@ -519,6 +538,33 @@ def plot_scatter_cv(df, structure_name, output_dir, output_format='png', dpi=300
     }
 
 
+def _process_one(structure_name, csv_path, output_dir, output_format, dpi, add_f_plot,
+                 capture=False):
+    """
+    读取一个结构的聚类结果并调用 plot_scatter_cv, 返回 (result, log)
+    
+    capture=True 时（进程池中运行）把打印内容收进 log, 交给主进程统一输出；
+    否则直接打印, log 为空字符串。读取失败或绘图失败时 result 为 None。
+    """
+    buf = io.StringIO()
+    redirect = contextlib.redirect_stdout(buf) if capture else contextlib.nullcontext()
+    try:
+        with redirect:
+            try:
+                df = pd.read_csv(csv_path)
+            except Exception as e:
+                print(f"  Error reading {csv_path}: {e}")
+                return None, buf.getvalue()
+            
+            result = plot_scatter_cv(df, structure_name, output_dir, output_format, dpi,
+                                     add_f_plot=add_f_plot)
+    except Exception:
+        # 出错时先把已收集的诊断信息打印出来, 再抛出异常
+        sys.stdout.write(buf.getvalue())
+        raise
+    return result, buf.getvalue()
+
+
 def list_available_structures(base_dir='results/step6_1_clustering'):
     """列出所有可用的结构"""
     results = find_clustering_results(base_dir)
@@ -626,6 +672,7 @@ def main():
     results = []
     success = 0
     failed = 0
+    tasks = []
     
     for structure in structures:
         # 查找结构（大小写不敏感）
@@ -640,17 +687,21 @@ def main():
             failed += 1
             continue
         
-        csv_path = available[found_name]
-        try:
-            df = pd.read_csv(csv_path)
-        except Exception as e:
-            print(f"  Error reading {csv_path}: {e}")
-            failed += 1
-            continue
-        
-        result = plot_scatter_cv(df, found_name, output_dir, args.format, args.dpi, 
-                                  add_f_plot=not args.no_f)
-        
+        tasks.append((found_name, available[found_name]))
+    
+    # --structure all 时每个结构交给一个子进程, 日志和结果按 tasks 的顺序输出
+    task_args = [(name, csv_path, output_dir, args.format, args.dpi, not args.no_f)
+                 for name, csv_path in tasks]
+    if len(tasks) > 1:
+        n_workers = min(os.cpu_count() or 1, len(tasks))
+        with ProcessPoolExecutor(max_workers=n_workers) as ex:
+            futures = [ex.submit(_process_one, *a, capture=True) for a in task_args]
+            task_results = [f.result() for f in futures]
+    else:
+        task_results = [_process_one(*a) for a in task_args]
+    
+    for result, log in task_results:
+        print(log, end='')
         if result:
             results.append(result)
             success += 1